@@ -0,0 +1,36 @@
+"""
+Shared YAML config loading: the C-backed loader for every config read, plus the cached
+load_config used by the standalone test scripts
+"""
+
+import copy
+import os
+from typing import Dict, Tuple
+
+import yaml
+
+# libyaml's C parser when PyYAML was built with it; same safe semantics as yaml.safe_load.
+# It reads bytes directly, so callers should open config files in binary mode
+try:
+    from yaml import CSafeLoader as YAML_LOADER
+except ImportError:
+    from yaml import SafeLoader as YAML_LOADER
+
+# (path, mtime_ns) -> parsed config; an edited file gets a new key and is parsed again
+_CONFIG_CACHE: Dict[Tuple[str, int], Dict] = {}
+
+
+def load_config(path: str = 'config.yaml') -> Dict:
+    """Load a YAML config file, reusing the parsed result while the file is unchanged.
+
+    An unchanged mtime skips even reading the file. Each call returns its own copy, so a caller
+    that edits its config does not change what later calls see.
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    key = (path, mtime_ns)
+    config = _CONFIG_CACHE.get(key)
+    if config is None:
+        with open(path, 'rb') as f:
+            config = yaml.load(f, Loader=YAML_LOADER)
+        _CONFIG_CACHE[key] = config
+    return copy.deepcopy(config)
@@ -1,8 +1,10 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 import yaml
 import os
 from dataclasses import dataclass
 
+from config_loader import YAML_LOADER
+
 
 @dataclass
 class RepositoryConfig:
@@ -31,14 +33,18 @@ class ConfigManager:
         self._config: Optional[Dict] = None
         self._repositories: Optional[RepositoryConfig] = None
         self._branch_strategies: Optional[List[BranchStrategy]] = None
+        self._strategy_by_repo: Optional[Dict[str, BranchStrategy]] = None
+        self._flow_index: Dict[str, Dict[str, int]] = {}
+        self._branch_to_env: Optional[Dict[str, str]] = None
+        self._wait_branches: Optional[FrozenSet[str]] = None
         
     def load_config(self) -> Dict:
         """Load and parse configuration file with environment variable substitution."""
         if self._config is not None:
             return self._config
             
-        with open(self.config_path, 'r') as file:
-            config = yaml.safe_load(file)
+        with open(self.config_path, 'rb') as file:
+            config = yaml.load(file, Loader=YAML_LOADER)
         
         self._config = self._replace_env_vars(config)
         return self._config
@@ -88,11 +94,13 @@ class ConfigManager:
     
     def get_repository_strategy(self, repo_name: str) -> Optional[BranchStrategy]:
         """Get branch strategy for a specific repository."""
-        strategies = self.get_branch_strategies()
-        for strategy in strategies:
-            if repo_name in strategy.repos:
-                return strategy
-        return None
+        if self._strategy_by_repo is None:
+            # Built once per loaded config; the first strategy listing a repo wins
+            self._strategy_by_repo = {}
+            for strategy in self.get_branch_strategies():
+                for repo in strategy.repos:
+                    self._strategy_by_repo.setdefault(repo, strategy)
+        return self._strategy_by_repo.get(repo_name)
     
     def get_repository_flow(self, repo_name: str) -> List[str]:
         """Get branch flow for a specific repository."""
@@ -101,16 +109,24 @@ class ConfigManager:
             return strategy.flow
         raise ValueError(f"No strategy found for repository: {repo_name}")
     
+    def get_flow_index(self, repo_name: str) -> Dict[str, int]:
+        """Get {branch: position} for a repository's flow, built once per repository."""
+        flow_index = self._flow_index.get(repo_name)
+        if flow_index is None:
+            flow_index = {}
+            for position, branch in enumerate(self.get_repository_flow(repo_name)):
+                # Keep the first occurrence to match list.index semantics
+                flow_index.setdefault(branch, position)
+            self._flow_index[repo_name] = flow_index
+        return flow_index
+    
     def get_next_branch(self, repo_name: str, current_branch: str) -> Optional[str]:
         """Get next branch in flow for a repository."""
         flow = self.get_repository_flow(repo_name)
         
-        try:
-            current_index = flow.index(current_branch)
-            if current_index < len(flow) - 1:
-                return flow[current_index + 1]
-        except ValueError:
-            pass
+        current_index = self.get_flow_index(repo_name).get(current_branch)
+        if current_index is not None and current_index < len(flow) - 1:
+            return flow[current_index + 1]
         
         return None
     
@@ -149,6 +165,33 @@ class ConfigManager:
             )
         return None
     
+    def _build_branch_indexes(self):
+        """Build branch -> environment lookups once per loaded config."""
+        environments = self.load_config().get('environments', {})
+        self._branch_to_env = {}
+        for env_name, env_config in environments.items():
+            for branch in env_config.get('triggered_by', []):
+                # The first environment listing a branch wins
+                self._branch_to_env.setdefault(branch, env_name)
+        self._wait_branches = frozenset(
+            branch
+            for env_config in environments.values()
+            if env_config.get('wait_for_deployment', False)
+            for branch in env_config.get('triggered_by', [])
+        )
+    
+    def get_environment_for_branch(self, branch: str) -> Optional[str]:
+        """Get the environment deployed by merging into a branch."""
+        if self._branch_to_env is None:
+            self._build_branch_indexes()
+        return self._branch_to_env.get(branch)
+    
+    def is_wait_for_deployment_branch(self, branch: str) -> bool:
+        """Check if a branch triggers an environment that waits for deployment."""
+        if self._wait_branches is None:
+            self._build_branch_indexes()
+        return branch in self._wait_branches
+    
     def get_gitlab_config(self) -> Dict:
         """Get GitLab configuration."""
         config = self.load_config()
@@ -0,0 +1,16 @@
+"""
+Shared pytest fixtures for the test scripts
+"""
+
+import pytest
+
+from config_loader import load_config
+
+
+@pytest.fixture(scope='session')
+def config():
+    """config.yaml parsed once for the whole test session."""
+    try:
+        return load_config('config.yaml')
+    except FileNotFoundError:
+        pytest.skip("config.yaml not found")
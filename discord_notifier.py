@@ -1,15 +1,67 @@
+import atexit
+import json
 import logging
+import os
+import queue
 import requests
+import threading
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
-from models import DeploymentProgress, MRStatus, DeploymentPhase
+from models import SLOTS, DeploymentProgress, MRStatus, DeploymentPhase
+
+# orjson (optional) encodes webhook payloads in C straight to bytes; without it requests uses stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Discord accepts at most 10 embeds per webhook message, with at most 6000 characters across all of them
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# How many times a rate-limited (429) webhook post is retried after waiting out Retry-After
+RATE_LIMIT_RETRIES = 3
+
+# Default for how long the background sender waits for more embeds to join a message
+BATCH_WINDOW_SECONDS = 2.0
+
+# How long interpreter exit waits for queued notifications before dropping them
+EXIT_FLUSH_TIMEOUT_SECONDS = 10.0
+
+# Fixed parts of the MR monitor embeds; only the repository and MR fields change per notification
+_PIPELINE_SUCCESS_FIELDS = (
+    {
+        'name': '⏳ Status',
+        'value': "Pipeline succeeded, auto-merge in progress...",
+        'inline': False
+    },
+)
+_AUTO_MERGE_WAITING_FIELDS = (
+    {
+        'name': '📋 Status',
+        'value': "• No pipeline detected\n• Waiting for approval or other conditions\n• Auto-merge will trigger when ready",
+        'inline': False
+    },
+    {
+        'name': '🔧 Possible Actions',
+        'value': "• Check if manual approval is required\n• Verify branch protection rules\n• Ensure all merge conditions are met",
+        'inline': False
+    },
+)
+
+def _embed_size(embed_dict: Dict) -> int:
+    """Characters of an embed that count toward Discord's per-message total"""
+    size = len(embed_dict.get('title', '')) + len(embed_dict.get('description', ''))
+    size += sum(len(field.get('name', '')) + len(field.get('value', '')) for field in embed_dict.get('fields', ()))
+    size += len((embed_dict.get('footer') or {}).get('text', ''))
+    return size
+
+@dataclass(**SLOTS)
 class DiscordEmbed:
     title: str
     description: str
@@ -19,9 +71,14 @@ class DiscordEmbed:
     timestamp: Optional[str] = None
 
 class DiscordNotifier:
-    def __init__(self, webhook_url: str, config: Dict):
+    def __init__(self, webhook_url: str, config: Dict, background: Optional[bool] = None,
+                 session: Optional[requests.Session] = None, dry_run: bool = False):
         self.webhook_url = webhook_url
         self.config = config
+        # Dry run: payloads are still built and JSON-encoded but never posted (used by the test script on CI)
+        self.dry_run = dry_run
+        # Keep-alive session so consecutive webhook posts reuse one TLS connection; may be shared with GitLabClient
+        self.session = session or requests.Session()
         
         # Discord colors
         self.colors = {
@@ -31,6 +88,40 @@ class DiscordNotifier:
             'red': 16711680,    # Error/Failed
             'purple': 10181046  # Special/Final
         }
+        
+        # Background mode: send_embed only queues the embed and a worker thread posts it,
+        # coalescing embeds queued close together into one webhook message.
+        # Callers may force it; otherwise discord.batch in the config decides (off by default)
+        discord_config = config.get('discord') or {}
+        if background is None:
+            background = bool(discord_config.get('batch', False))
+        self.background = background
+        self.batch_window = float(discord_config.get('batch_window_seconds', BATCH_WINDOW_SECONDS))
+        self._queue: "queue.Queue[Tuple[Dict, Optional[str]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls, **kwargs) -> "DiscordNotifier":
+        """
+        สร้าง notifier จาก environment variables โดยไม่ต้องโหลด config.yaml
+        
+        ใช้ DISCORD_WEBHOOK_URL (จำเป็น ยกเว้นเมื่อ dry_run) และ DISCORD_MENTION_CRITICAL / DISCORD_MENTION_SUCCESS (ไม่บังคับ)
+        """
+        webhook_url = os.getenv('DISCORD_WEBHOOK_URL', '')
+        if not webhook_url and not kwargs.get('dry_run'):
+            raise ValueError("DISCORD_WEBHOOK_URL is not set")
+        
+        config = {
+            'discord': {
+                'webhook_url': webhook_url,
+                'mentions': {
+                    'critical_failure': os.getenv('DISCORD_MENTION_CRITICAL', ''),
+                    'success': os.getenv('DISCORD_MENTION_SUCCESS', '')
+                }
+            }
+        }
+        return cls(webhook_url, config, **kwargs)
     
     def send_embed(self, embed: DiscordEmbed, mentions: Optional[str] = None) -> bool:
         try:
@@ -45,15 +136,11 @@ class DiscordNotifier:
             if embed.footer:
                 embed_dict['footer'] = embed.footer
             
-            payload = {
-                'embeds': [embed_dict]
-            }
-            
-            if mentions:
-                payload['content'] = mentions
+            if self.background:
+                self._enqueue(embed_dict, mentions)
+                return True
             
-            response = requests.post(self.webhook_url, json=payload)
-            response.raise_for_status()
+            self._post([embed_dict], mentions)
             
             logger.info(f"Discord notification sent: {embed.title}")
             return True
@@ -62,6 +149,133 @@ class DiscordNotifier:
             logger.error(f"Failed to send Discord notification: {e}")
             return False
     
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        รอจนกว่า notifications ที่อยู่ในคิวจะถูกส่งครบ (ใช้กับ background mode)
+        
+        Args:
+            timeout: (optional) เวลารอสูงสุด (วินาที) ถ้าไม่กำหนดจะรอจนส่งครบ
+        
+        Returns:
+            True ถ้าส่งครบ, False ถ้าหมดเวลาก่อน (notifications ที่เหลือถูก log ว่า dropped)
+        """
+        if self._worker is None:
+            return True
+        
+        if timeout is None:
+            self._queue.join()
+            return True
+        
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Dropped {self._queue.unfinished_tasks} Discord notification(s) "
+                                   f"still queued after {timeout}s")
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+    
+    def _post(self, embeds: List[Dict], mentions: Optional[str] = None):
+        payload = {
+            'embeds': embeds
+        }
+        
+        if mentions:
+            payload['content'] = mentions
+        
+        if self.dry_run:
+            # Encode exactly as a real post would so payload errors still surface, then skip the request
+            body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode('utf-8')
+            logger.debug(f"Dry run: skipped posting {len(body)} byte Discord payload")
+            return
+        
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            if orjson is not None:
+                response = self.session.post(self.webhook_url, data=orjson.dumps(payload),
+                                             headers={'Content-Type': 'application/json'})
+            else:
+                response = self.session.post(self.webhook_url, json=payload)
+            
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                break
+            # Rate limited: Discord says how long to wait (seconds) before posting again
+            retry_after = float(response.headers.get('Retry-After', 1))
+            logger.warning(f"Discord rate limited the webhook, retrying in {retry_after}s")
+            time.sleep(retry_after)
+        response.raise_for_status()
+    
+    def _enqueue(self, embed_dict: Dict, mentions: Optional[str]):
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain, name="discord-notifier", daemon=True)
+                self._worker.start()
+                # Daemon threads die with the interpreter; send whatever is still queued first,
+                # but don't let a hung webhook keep the process from exiting
+                atexit.register(self.flush, EXIT_FLUSH_TIMEOUT_SECONDS)
+        
+        self._queue.put((embed_dict, mentions))
+    
+    def _drain(self):
+        # An embed that would push a message over Discord's size limit starts the next message
+        carry = None
+        while True:
+            batch = [carry if carry is not None else self._queue.get()]
+            carry = None
+            size = _embed_size(batch[0][0])
+            
+            # Coalesce embeds queued within the batch window into one message
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                
+                item_size = _embed_size(item[0])
+                if size + item_size > MAX_EMBED_CHARS_PER_MESSAGE:
+                    carry = item
+                    break
+                batch.append(item)
+                size += item_size
+            
+            try:
+                self._send_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _send_batch(self, batch: List[Tuple[Dict, Optional[str]]]):
+        """ส่ง embeds ที่รวมไว้เป็น message เดียว ถ้า Discord ปฏิเสธ (4xx) จะส่งทีละ embed แทนการทิ้งทั้ง batch"""
+        embeds = [embed_dict for embed_dict, _ in batch]
+        mentions = " ".join(dict.fromkeys(mention for _, mention in batch if mention)) or None
+        
+        try:
+            self._post(embeds, mentions)
+            for embed_dict in embeds:
+                logger.info(f"Discord notification sent: {embed_dict['title']}")
+            return
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if len(batch) == 1 or status is None or not 400 <= status < 500:
+                logger.error(f"Failed to send Discord notification: {e}")
+                return
+            logger.warning(f"Discord rejected a batch of {len(batch)} notifications ({status}), sending them one by one")
+        except Exception as e:
+            logger.error(f"Failed to send Discord notification: {e}")
+            return
+        
+        for embed_dict, embed_mentions in batch:
+            try:
+                self._post([embed_dict], embed_mentions)
+                logger.info(f"Discord notification sent: {embed_dict['title']}")
+            except Exception as e:
+                logger.error(f"Failed to send Discord notification {embed_dict['title']}: {e}")
+    
     def send_deployment_start(self, sprint_name: str, libraries: List[str], services: List[str]) -> bool:
         libraries_text = "\n".join([f"📦 {repo}" for repo in libraries])
         services_text = "\n".join([f"⚙️ {repo}" for repo in services])
@@ -460,11 +674,7 @@ class DiscordNotifier:
                     'value': f"[MR #{mr_id}]({mr_url})" if mr_url else f"MR #{mr_id}",
                     'inline': True
                 },
-                {
-                    'name': '⏳ Status',
-                    'value': "Pipeline succeeded, auto-merge in progress...",
-                    'inline': False
-                }
+                *_PIPELINE_SUCCESS_FIELDS
             ],
             footer={'text': 'MR Automation Bot - Pipeline Monitor'}
         )
@@ -498,16 +708,7 @@ class DiscordNotifier:
                     'value': f"[MR #{mr_id}]({mr_url})" if mr_url else f"MR #{mr_id}",
                     'inline': True
                 },
-                {
-                    'name': '📋 Status',
-                    'value': "• No pipeline detected\n• Waiting for approval or other conditions\n• Auto-merge will trigger when ready",
-                    'inline': False
-                },
-                {
-                    'name': '🔧 Possible Actions',
-                    'value': "• Check if manual approval is required\n• Verify branch protection rules\n• Ensure all merge conditions are met",
-                    'inline': False
-                }
+                *_AUTO_MERGE_WAITING_FIELDS
             ],
             footer={'text': 'MR Automation Bot - Auto-merge Monitor'}
         )
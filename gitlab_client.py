@@ -1,19 +1,64 @@
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import gitlab
 import requests
 from gitlab.exceptions import GitlabGetError, GitlabCreateError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections kept per host by the shared GitLab session
+HTTP_POOL_SIZE = 32
+
+# Seconds a fetched project object is reused by get_project
+PROJECT_CACHE_TTL = 300
+
+# MR polling backs off by this factor while an MR's observed status stays the same,
+# up to MR_POLL_MAX_INTERVAL seconds, and drops back to the status' base wait on change
+MR_POLL_BACKOFF = 1.5
+MR_POLL_MAX_INTERVAL = 60
+
+# Deployment polling backs off the same way while the deployment status stays the same
+DEPLOYMENT_POLL_MAX_INTERVAL = 180
+
+def _create_http_session(pool_size: int = HTTP_POOL_SIZE,
+                         session: Optional[requests.Session] = None) -> requests.Session:
+    """สร้าง requests session (หรือตั้งค่า session ที่ส่งเข้ามา) ให้ reuse connection (keep-alive) และ retry เมื่อเชื่อมต่อไม่สำเร็จ"""
+    session = session or requests.Session()
+    # pool_block makes threads wait for a free connection instead of opening extra ones, so the
+    # pool size also caps how many requests hit GitLab at once across all worker pools
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        pool_block=True,
+        max_retries=Retry(total=3, backoff_factor=0.3)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 class GitLabClient:
-    def __init__(self, base_url: str, token: str, group_name: str, discord_notifier=None):
-        self.gl = gitlab.Gitlab(base_url, private_token=token)
+    def __init__(self, base_url: str, token: str, group_name: str, discord_notifier=None,
+                 max_workers: int = 0, session: Optional[requests.Session] = None):
+        # Every worker thread needs its own keep-alive connection; a pool smaller than the
+        # worker count makes urllib3 open and throw away extra connections on each burst.
+        # A caller-supplied session (e.g. shared with DiscordNotifier) gets the same pooled adapter
+        session = _create_http_session(max(HTTP_POOL_SIZE, max_workers), session)
+        # python-gitlab retries 429/5xx responses itself (honouring Retry-After, with backoff),
+        # so a rate-limited or briefly unavailable GitLab no longer drops a repo from the run
+        self.gl = gitlab.Gitlab(base_url, private_token=token, session=session,
+                                retry_transient_errors=True)
         self.group_name = group_name
         self.group = self._get_group()
         self.current_user = self._get_current_user()
         self.discord_notifier = discord_notifier
+        self._project_cache: Dict[str, Tuple[float, object]] = {}
+        # Projects that GitLab reported as missing (404); retrying them cannot succeed during this run
+        self._project_failures: Dict[str, GitlabGetError] = {}
         
     def _get_group(self):
         try:
@@ -48,14 +93,34 @@ class GitLabClient:
                 return None
     
     def get_project(self, repo_name: str):
+        # Project metadata barely changes during a run; reuse it instead of re-fetching per call
+        cached = self._project_cache.get(repo_name)
+        if cached and time.monotonic() - cached[0] < PROJECT_CACHE_TTL:
+            return cached[1]
+        
+        failure = self._project_failures.get(repo_name)
+        if failure is not None:
+            raise failure
+        
         try:
             project_path = f"{self.group_name}/{repo_name}"
-            return self.gl.projects.get(project_path)
+            project = self.gl.projects.get(project_path)
         except GitlabGetError as e:
             logger.error(f"Failed to get project {repo_name}: {e}")
+            if e.response_code == 404:
+                self._project_failures[repo_name] = e
             raise
+        
+        self._project_cache[repo_name] = (time.monotonic(), project)
+        return project
     
-    def validate_commits(self, repo_name: str, source_branch: str, target_branch: str) -> Tuple[bool, int]:
+    def count_new_commits(self, repo_name: str, source_branch: str, target_branch: str) -> Optional[int]:
+        """
+        นับ commits ที่อยู่ใน source_branch แต่ยังไม่อยู่ใน target_branch ด้วย compare call เดียว
+        
+        Returns:
+            จำนวน commits หรือ None ถ้า branch ใด branch หนึ่งไม่มีอยู่ (compare ตอบ 404)
+        """
         try:
             project = self.get_project(repo_name)
             
@@ -63,14 +128,61 @@ class GitLabClient:
             commits = project.repository_compare(from_=target_branch, to=source_branch)
             commit_count = len(commits.get('commits', []))
             
-            has_new_commits = commit_count > 0
             logger.info(f"{repo_name}: {commit_count} new commits from {source_branch} to {target_branch}")
-            
-            return has_new_commits, commit_count
+            return commit_count
             
+        except GitlabGetError as e:
+            if e.response_code == 404:
+                logger.debug(f"{repo_name}: cannot compare {source_branch} to {target_branch}: {e}")
+                return None
+            raise
+    
+    def validate_commits(self, repo_name: str, source_branch: str, target_branch: str) -> Tuple[bool, int]:
+        try:
+            commit_count = self.count_new_commits(repo_name, source_branch, target_branch)
         except GitlabGetError as e:
             logger.error(f"Failed to validate commits for {repo_name}: {e}")
             return False, 0
+        
+        # A missing branch means there is nothing to merge; callers no longer pre-check existence
+        if commit_count is None:
+            return False, 0
+        return commit_count > 0, commit_count
+    
+    def batch_validate_commits(self, queries: List[Tuple[str, str, str]],
+                               max_workers: int = 8) -> Dict[Tuple[str, str, str], Tuple[bool, int]]:
+        """
+        ตรวจสอบ commits ของหลาย (repo, source_branch, target_branch) พร้อมกัน
+        query ที่ซ้ำกันจะถูกเรียก API เพียงครั้งเดียว
+        
+        Args:
+            queries: รายการ (repo_name, source_branch, target_branch)
+            max_workers: จำนวน compare request สูงสุดที่ทำพร้อมกัน
+        
+        Returns:
+            Dictionary mapping (repo_name, source_branch, target_branch) to (has_new_commits, commit_count)
+            query ที่ตรวจไม่สำเร็จ (API error) จะไม่อยู่ในผลลัพธ์ เพื่อไม่ให้ผู้เรียก cache ผลที่ไม่แน่นอน
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        
+        def validate(query: Tuple[str, str, str]) -> Optional[Tuple[bool, int]]:
+            try:
+                commit_count = self.count_new_commits(*query)
+            except Exception as e:
+                logger.error(f"Failed to validate commits for {query[0]}: {e}")
+                return None
+            
+            if commit_count is None:
+                return False, 0
+            return commit_count > 0, commit_count
+        
+        if len(unique_queries) <= 1:
+            results = [validate(query) for query in unique_queries]
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(validate, unique_queries))
+        
+        return {query: result for query, result in zip(unique_queries, results) if result is not None}
     
     def branch_exists(self, repo_name: str, branch_name: str) -> bool:
         try:
@@ -80,6 +192,41 @@ class GitLabClient:
         except GitlabGetError:
             return False
     
+    def get_branch_heads(self, repo_name: str) -> Dict[str, str]:
+        """ดึง head commit SHA ของทุก branch ใน repo ด้วย list call เดียว"""
+        project = self.get_project(repo_name)
+        return {branch.name: branch.commit['id'] for branch in project.branches.list(all=True, per_page=100)}
+    
+    def is_ancestor(self, repo_name: str, ancestor_sha: str, descendant_ref: str) -> bool:
+        """
+        ตรวจว่า commit ancestor_sha อยู่ในประวัติของ descendant_ref แล้วหรือไม่ (merge แล้ว)
+        ใช้ merge_base ซึ่งคืน commit เดียว ไม่ต้องให้ GitLab สร้างรายการ commits และ diff แบบ compare
+        
+        Args:
+            repo_name: ชื่อ repository
+            ancestor_sha: SHA ที่ต้องการตรวจ (เช่น head ของ source branch)
+            descendant_ref: branch หรือ SHA ปลายทาง
+        
+        Returns:
+            True ถ้า ancestor_sha เป็น ancestor ของ descendant_ref
+        """
+        project = self.get_project(repo_name)
+        merge_base = project.repository_merge_base([ancestor_sha, descendant_ref])
+        return merge_base['id'] == ancestor_sha
+    
+    def get_open_mr_pairs(self, repo_name: str) -> Set[Tuple[str, str]]:
+        """ดึงคู่ (source, target) ของ MR ที่เปิดอยู่ทั้งหมดใน repo ด้วย paginated list call เดียว"""
+        project = self.get_project(repo_name)
+        return {(mr.source_branch, mr.target_branch)
+                for mr in project.mergerequests.list(state='opened', all=True, per_page=100)}
+    
+    def get_group_open_mr_pairs(self) -> Dict[int, Set[Tuple[str, str]]]:
+        """ดึง MR ที่เปิดอยู่ของทั้ง group ด้วย paginated query เดียว (project_id -> {(source, target)})"""
+        pairs: Dict[int, Set[Tuple[str, str]]] = {}
+        for mr in self.group.mergerequests.list(state='opened', all=True, per_page=100):
+            pairs.setdefault(mr.project_id, set()).add((mr.source_branch, mr.target_branch))
+        return pairs
+    
     def check_pipeline_status(self, repo_name: str, branch_name: str) -> Optional[str]:
         try:
             project = self.get_project(repo_name)
@@ -108,7 +255,9 @@ class GitLabClient:
             existing_mrs = project.mergerequests.list(
                 source_branch=source_branch,
                 target_branch=target_branch,
-                state='opened'
+                state='opened',
+                per_page=1,
+                get_all=False
             )
             
             if existing_mrs:
@@ -170,7 +319,7 @@ Auto-merge enabled - {sprint_name}
             return None
     
     def create_merge_request_with_commits(self, repo_name: str, source_branch: str, target_branch: str, 
-                                        sprint_name: str, commit_details: List[Dict], 
+                                        sprint_name: str, commit_details: Optional[List[Dict]] = None, 
                                         auto_merge: bool = True) -> Optional[Dict]:
         """
         สร้าง MR พร้อมกับรายละเอียด commits
@@ -180,7 +329,7 @@ Auto-merge enabled - {sprint_name}
             source_branch: source branch
             target_branch: target branch
             sprint_name: ชื่อ sprint
-            commit_details: รายละเอียด commits
+            commit_details: รายละเอียด commits (None = ดึงจาก GitLab เฉพาะเมื่อต้องสร้าง MR ใหม่)
             auto_merge: เปิด auto-merge หรือไม่
         
         Returns:
@@ -193,7 +342,9 @@ Auto-merge enabled - {sprint_name}
             existing_mrs = project.mergerequests.list(
                 source_branch=source_branch,
                 target_branch=target_branch,
-                state='opened'
+                state='opened',
+                per_page=1,
+                get_all=False
             )
             
             if existing_mrs:
@@ -216,6 +367,9 @@ Auto-merge enabled - {sprint_name}
                     'existing': True  # Flag to indicate this was an existing MR
                 }
             
+            if commit_details is None:
+                commit_details = self.get_commit_details(repo_name, source_branch, target_branch)
+            
             title = f"{source_branch} -> {target_branch}"
             
             description = f"""
@@ -255,16 +409,23 @@ Auto-merge enabled - {sprint_name}
             logger.error(f"Failed to create enhanced MR for {repo_name}: {e}")
             return None
     
+    def _get_mr_with_merge_status(self, project, mr_iid: int):
+        """
+        ดึง MR พร้อมให้ GitLab คำนวณ merge_status ใหม่ในการอ่านครั้งเดียว (with_merge_status_recheck)
+        แทนการ get ซ้ำเพื่อ refresh สถานะที่ยังเป็น unchecked
+        """
+        mrs = project.mergerequests.list(iids=[mr_iid], with_merge_status_recheck=True, get_all=False)
+        if mrs:
+            return mrs[0]
+        return project.mergerequests.get(mr_iid)
+    
     def _enable_auto_merge(self, project, mr_iid: int):
         try:
-            mr = project.mergerequests.get(mr_iid)
+            mr = self._get_mr_with_merge_status(project, mr_iid)
             
             # First, check if MR can be merged at all
             logger.info(f"Checking MR {mr_iid} merge status: {mr.merge_status}, state: {mr.state}")
             
-            # Refresh MR data to get latest merge status
-            mr = project.mergerequests.get(mr_iid, lazy=False)
-            
             if mr.state == 'merged':
                 logger.info(f"MR {mr_iid} is already merged")
                 return True
@@ -282,7 +443,7 @@ Auto-merge enabled - {sprint_name}
                 # Wait a bit for GitLab to finish checking
                 import time
                 time.sleep(5)
-                mr = project.mergerequests.get(mr_iid, lazy=False)
+                mr = self._get_mr_with_merge_status(project, mr_iid)
             
             # Check current pipeline status
             pipeline_status = self.check_pipeline_status(project.name.split('/')[-1], mr.source_branch)
@@ -327,7 +488,7 @@ Auto-merge enabled - {sprint_name}
                 }
                 
                 logger.debug(f"Calling GitLab merge API for MR {mr_iid} with data: {merge_data}")
-                response = requests.put(merge_url, headers=headers, json=merge_data)
+                response = self.gl.session.put(merge_url, headers=headers, json=merge_data)
                 
                 logger.debug(f"GitLab API response for MR {mr_iid}: {response.status_code}")
                 
@@ -494,7 +655,7 @@ Auto-merge enabled - {sprint_name}
             }
             
             logger.info(f"Trying raw API merge for MR {mr_iid}")
-            response = requests.put(merge_url, headers=headers, json=merge_data)
+            response = self.gl.session.put(merge_url, headers=headers, json=merge_data)
             
             if response.status_code in [200, 202]:
                 logger.info(f"✅ Successfully merged MR {mr_iid} via raw API")
@@ -630,87 +791,184 @@ Auto-merge enabled - {sprint_name}
     
     
     def monitor_merge_status(self, repo_name: str, mr_id: int, timeout: int = 1800) -> Tuple[bool, str]:
-        try:
-            project = self.get_project(repo_name)
-            start_time = time.time()
-            pipeline_success_notified = False  # Track if we've already sent notification
-            auto_merge_waiting_notified = False  # Track if we've already sent auto-merge waiting notification
-            
-            while time.time() - start_time < timeout:
-                mr = project.mergerequests.get(mr_id)
-                state = mr.state
+        results = self.monitor_merge_statuses([(repo_name, mr_id)], timeout)
+        return results[(repo_name, mr_id)]
+    
+    def monitor_merge_statuses(self, mrs: List[Tuple[str, int]], timeout: int = 1800, max_workers: int = 8,
+                               on_result: Optional[Callable[[Tuple[str, int], Tuple[bool, str]], None]] = None
+                               ) -> Dict[Tuple[str, int], Tuple[bool, str]]:
+        """
+        ติดตามสถานะหลาย MR พร้อมกันใน polling loop เดียว
+        แต่ละรอบจะดึงสถานะ MR ที่ถึงเวลาตรวจของ repo ด้วย list call เดียว (iids filter)
+        แล้วตรวจ pipeline ของแต่ละ MR แบบขนานกันผ่าน thread pool
+        MR ที่สถานะไม่เปลี่ยนจะถูกตรวจห่างขึ้นเรื่อยๆ (adaptive backoff) เพื่อลดจำนวน API call
+        
+        Args:
+            mrs: รายการ (repo_name, mr_id) ที่ต้องการติดตาม
+            timeout: เวลาสูงสุด (วินาที) สำหรับทั้งชุด
+            max_workers: จำนวน request สูงสุดที่ทำพร้อมกันในแต่ละรอบ
+            on_result: callback ที่ถูกเรียกทันทีเมื่อ MR แต่ละรายการได้ผลลัพธ์สุดท้าย
+        
+        Returns:
+            Dictionary mapping (repo_name, mr_id) to (success, final_state)
+        """
+        results = {}
+        
+        def finish(key: Tuple[str, int], outcome: Tuple[bool, str]):
+            results[key] = outcome
+            if on_result:
+                on_result(key, outcome)
+        
+        pending = {key: {'pipeline_success_notified': False, 'auto_merge_waiting_notified': False}
+                   for key in mrs}
+        start_time = time.time()
+        # key -> (next poll time, current interval, base wait of the last observed status)
+        schedule = {key: (start_time, 0, None) for key in mrs}
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending and time.time() - start_time < timeout:
+                now = time.time()
+                repo_notified = {}
+                for (repo_name, mr_id), notified in pending.items():
+                    if schedule[(repo_name, mr_id)][0] <= now:
+                        repo_notified.setdefault(repo_name, {})[mr_id] = notified
                 
-                if state == 'merged':
-                    logger.info(f"MR {mr_id} for {repo_name} successfully merged")
-                    return True, "merged"
-                elif state == 'closed':
-                    logger.warning(f"MR {mr_id} for {repo_name} was closed")
-                    return False, "closed"
-                elif state == 'opened':
-                    # Check pipeline status
-                    pipeline_status = self.check_pipeline_status(repo_name, mr.source_branch)
+                list_futures = {
+                    executor.submit(self._fetch_repo_merge_requests, repo_name, list(notified)): repo_name
+                    for repo_name, notified in repo_notified.items()
+                }
+                
+                # MR ที่ได้มาแล้วถูกตรวจ pipeline แยกกันแบบขนาน (ไม่รอ MR อื่นใน repo เดียวกัน)
+                check_futures = {}
+                for future, repo_name in list_futures.items():
+                    try:
+                        mrs_by_iid = future.result()
+                    except Exception as e:
+                        for mr_id in repo_notified[repo_name]:
+                            logger.error(f"Failed to monitor MR {mr_id} for {repo_name}: {e}")
+                            del pending[(repo_name, mr_id)]
+                            finish((repo_name, mr_id), (False, "error"))
+                        continue
                     
-                    if pipeline_status == 'failed':
-                        logger.error(f"Pipeline failed for MR {mr_id} in {repo_name}")
-                        return False, "pipeline_failed"
-                    elif pipeline_status == 'success':
-                        logger.info(f"Pipeline succeeded for MR {mr_id} in {repo_name}, waiting for auto-merge...")
+                    for mr_id, notified in repo_notified[repo_name].items():
+                        mr = mrs_by_iid.get(mr_id)
+                        if mr is None:
+                            logger.error(f"Failed to monitor MR {mr_id} for {repo_name}: MR not found")
+                            del pending[(repo_name, mr_id)]
+                            finish((repo_name, mr_id), (False, "error"))
+                            continue
                         
-                        # Send Discord notification once for pipeline success
-                        if not pipeline_success_notified and self.discord_notifier:
-                            try:
-                                self.discord_notifier.send_pipeline_success_notification(
-                                    repo_name=repo_name,
-                                    mr_id=mr_id,
-                                    mr_url=mr.web_url
-                                )
-                                pipeline_success_notified = True
-                                logger.info(f"Discord notification sent for pipeline success in {repo_name}")
-                            except Exception as e:
-                                logger.warning(f"Failed to send Discord notification for {repo_name}: {e}")
-                        
-                        # Pipeline succeeded, wait for GitLab to auto-merge
-                        time.sleep(10)
+                        future = executor.submit(self._check_merge_progress, repo_name, mr, notified)
+                        check_futures[future] = (repo_name, mr_id)
+                
+                for future, key in check_futures.items():
+                    try:
+                        outcome, wait_time = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to monitor MR {key[1]} for {key[0]}: {e}")
+                        outcome, wait_time = (False, "error"), 0
+                    
+                    if outcome:
+                        del pending[key]
+                        finish(key, outcome)
                         continue
-                    elif pipeline_status is None:
-                        logger.info(f"No pipeline for MR {mr_id} in {repo_name}, attempting direct merge...")
-                        
-                        # No pipeline exists, try to merge directly
-                        try:
-                            merge_result = mr.merge(should_remove_source_branch=False)
-                            logger.info(f"Direct merged MR {mr_id} for {repo_name} - no pipeline required")
-                            return True, "merged"
-                        except Exception as merge_error:
-                            logger.warning(f"Direct merge failed for MR {mr_id} in {repo_name}: {merge_error}")
-                            
-                            # Send Discord notification once for auto-merge waiting as fallback
-                            if not auto_merge_waiting_notified and self.discord_notifier:
-                                try:
-                                    self.discord_notifier.send_auto_merge_waiting_notification(
-                                        repo_name=repo_name,
-                                        mr_id=mr_id,
-                                        mr_url=mr.web_url
-                                    )
-                                    auto_merge_waiting_notified = True
-                                    logger.info(f"Discord notification sent for auto-merge waiting in {repo_name}")
-                                except Exception as e:
-                                    logger.warning(f"Failed to send Discord auto-merge waiting notification for {repo_name}: {e}")
-                            
-                            time.sleep(20)
+                    
+                    _, interval, last_wait = schedule[key]
+                    if wait_time == last_wait:
+                        interval = min(interval * MR_POLL_BACKOFF, MR_POLL_MAX_INTERVAL)
                     else:
-                        # Pipeline is running/pending
-                        logger.info(f"MR {mr_id} for {repo_name} still open, pipeline: {pipeline_status}")
-                        time.sleep(30)
-                else:
-                    logger.warning(f"Unknown MR state for {repo_name}: {state}")
-                    time.sleep(30)
-            
+                        interval = wait_time
+                    schedule[key] = (now + interval, interval, wait_time)
+                
+                if pending:
+                    next_poll = min(schedule[key][0] for key in pending)
+                    remaining = start_time + timeout - time.time()
+                    time.sleep(max(0, min(next_poll - time.time(), remaining)))
+        
+        for repo_name, mr_id in pending:
             logger.error(f"Timeout waiting for MR {mr_id} in {repo_name}")
-            return False, "timeout"
+            finish((repo_name, mr_id), (False, "timeout"))
+        
+        return results
+    
+    def _fetch_repo_merge_requests(self, repo_name: str, mr_ids: List[int]) -> Dict[int, object]:
+        """ดึง MR ที่ต้องการตรวจของ repo หนึ่งในรอบ polling ปัจจุบันด้วย list call เดียว (iids filter)"""
+        project = self.get_project(repo_name)
+        return {mr.iid: mr for mr in project.mergerequests.list(iids=mr_ids, all=True)}
+    
+    def _check_merge_progress(self, repo_name: str, mr, notified: Dict[str, bool]) -> Tuple[Optional[Tuple[bool, str]], int]:
+        """
+        ตรวจสอบ MR หนึ่งรายการในรอบ polling ปัจจุบัน
+        
+        Returns:
+            (final result or None if still pending, seconds to wait before next check)
+        """
+        mr_id = mr.iid
+        state = mr.state
+        
+        if state == 'merged':
+            logger.info(f"MR {mr_id} for {repo_name} successfully merged")
+            return (True, "merged"), 0
+        elif state == 'closed':
+            logger.warning(f"MR {mr_id} for {repo_name} was closed")
+            return (False, "closed"), 0
+        elif state != 'opened':
+            logger.warning(f"Unknown MR state for {repo_name}: {state}")
+            return None, 30
+        
+        # Check pipeline status
+        pipeline_status = self.check_pipeline_status(repo_name, mr.source_branch)
+        
+        if pipeline_status == 'failed':
+            logger.error(f"Pipeline failed for MR {mr_id} in {repo_name}")
+            return (False, "pipeline_failed"), 0
+        elif pipeline_status == 'success':
+            logger.info(f"Pipeline succeeded for MR {mr_id} in {repo_name}, waiting for auto-merge...")
+            
+            # Send Discord notification once for pipeline success
+            if not notified['pipeline_success_notified'] and self.discord_notifier:
+                try:
+                    self.discord_notifier.send_pipeline_success_notification(
+                        repo_name=repo_name,
+                        mr_id=mr_id,
+                        mr_url=mr.web_url
+                    )
+                    notified['pipeline_success_notified'] = True
+                    logger.info(f"Discord notification sent for pipeline success in {repo_name}")
+                except Exception as e:
+                    logger.warning(f"Failed to send Discord notification for {repo_name}: {e}")
             
-        except GitlabGetError as e:
-            logger.error(f"Failed to monitor MR {mr_id} for {repo_name}: {e}")
-            return False, "error"
+            # Pipeline succeeded, wait for GitLab to auto-merge
+            return None, 10
+        elif pipeline_status is None:
+            logger.info(f"No pipeline for MR {mr_id} in {repo_name}, attempting direct merge...")
+            
+            # No pipeline exists, try to merge directly
+            try:
+                mr.merge(should_remove_source_branch=False)
+                logger.info(f"Direct merged MR {mr_id} for {repo_name} - no pipeline required")
+                return (True, "merged"), 0
+            except Exception as merge_error:
+                logger.warning(f"Direct merge failed for MR {mr_id} in {repo_name}: {merge_error}")
+                
+                # Send Discord notification once for auto-merge waiting as fallback
+                if not notified['auto_merge_waiting_notified'] and self.discord_notifier:
+                    try:
+                        self.discord_notifier.send_auto_merge_waiting_notification(
+                            repo_name=repo_name,
+                            mr_id=mr_id,
+                            mr_url=mr.web_url
+                        )
+                        notified['auto_merge_waiting_notified'] = True
+                        logger.info(f"Discord notification sent for auto-merge waiting in {repo_name}")
+                    except Exception as e:
+                        logger.warning(f"Failed to send Discord auto-merge waiting notification for {repo_name}: {e}")
+                
+                return None, 20
+        else:
+            # Pipeline is running/pending
+            logger.info(f"MR {mr_id} for {repo_name} still open, pipeline: {pipeline_status}")
+            return None, 30
     
     def get_deployment_status(self, repo_name: str, environment: str) -> Optional[str]:
         try:
@@ -727,10 +985,30 @@ Auto-merge enabled - {sprint_name}
             logger.error(f"Failed to get deployment status for {repo_name}:{environment}: {e}")
             return None
     
-    def wait_for_deployment(self, repo_name: str, environment: str, timeout: int = 3600) -> bool:
+    def wait_for_deployment(self, repo_name: str, environment: str, timeout: int = 3600,
+                            cancel_event: Optional[threading.Event] = None) -> bool:
+        """
+        รอจนกว่า deployment ของ repo ใน environment จะสำเร็จหรือล้มเหลว
+        
+        Args:
+            repo_name: ชื่อ repository
+            environment: ชื่อ environment
+            timeout: เวลาสูงสุด (วินาที)
+            cancel_event: (optional) เมื่อถูก set จะหยุดรอทันทีและคืนค่า False
+        
+        Returns:
+            True ถ้า deployment สำเร็จ
+        """
         start_time = time.time()
+        cancel_event = cancel_event or threading.Event()
+        last_status = None
+        interval = 0
         
         while time.time() - start_time < timeout:
+            if cancel_event.is_set():
+                logger.info(f"Stopped waiting for deployment of {repo_name} in {environment}")
+                return False
+            
             status = self.get_deployment_status(repo_name, environment)
             
             if status == 'success':
@@ -739,12 +1017,24 @@ Auto-merge enabled - {sprint_name}
             elif status == 'failed':
                 logger.error(f"Deployment failed for {repo_name} in {environment}")
                 return False
-            elif status in ['running', 'created']:
+            
+            if status in ['running', 'created']:
                 logger.info(f"Deployment in progress for {repo_name} in {environment}: {status}")
-                time.sleep(60)
+                base_interval = 60
             else:
                 logger.info(f"Waiting for deployment to start for {repo_name} in {environment}")
-                time.sleep(30)
+                base_interval = 30
+            
+            # ถ้าสถานะยังเหมือนเดิมให้ตรวจห่างขึ้นเรื่อยๆ (ลด API call ระหว่างรอ deployment นานๆ)
+            # สถานะเปลี่ยนเมื่อไรกลับไปใช้ช่วงเวลาพื้นฐาน
+            if status == last_status:
+                interval = min(interval * MR_POLL_BACKOFF, DEPLOYMENT_POLL_MAX_INTERVAL)
+            else:
+                interval = base_interval
+            last_status = status
+            
+            remaining = timeout - (time.time() - start_time)
+            cancel_event.wait(max(0, min(interval, remaining)))
         
         logger.error(f"Timeout waiting for deployment of {repo_name} in {environment}")
         return False
@@ -758,7 +1048,8 @@ Auto-merge enabled - {sprint_name}
             
             for mr_id in mr_ids:
                 try:
-                    mr = project.mergerequests.get(mr_id)
+                    # One read with a merge status recheck instead of a get plus a refreshing get
+                    mr = self._get_mr_with_merge_status(project, mr_id)
                     
                     if mr.state == 'merged':
                         results[mr_id] = True
@@ -770,9 +1061,6 @@ Auto-merge enabled - {sprint_name}
                         logger.warning(f"MR {mr_id} is not open (state: {mr.state})")
                         continue
                     
-                    # Check merge status first - refresh to get latest status
-                    mr = project.mergerequests.get(mr_id, lazy=False)
-                    
                     if mr.merge_status == 'cannot_be_merged':
                         results[mr_id] = False
                         logger.warning(f"MR {mr_id} has merge conflicts - cannot be merged")
@@ -866,6 +1154,11 @@ Auto-merge enabled - {sprint_name}
             # Get all branches
             branches = project.branches.list(all=True)
             
+            # Head SHAs come with the branch list; a branch pointing at the same commit as
+            # the final target or the after-merge branch cannot pass both compares below
+            heads = {branch.name: branch.commit['id'] for branch in branches}
+            settled_heads = {heads.get(final_target_branch), heads.get(after_merge_branch)}
+            
             for branch in branches:
                 branch_name = branch.name
                 
@@ -873,6 +1166,9 @@ Auto-merge enabled - {sprint_name}
                 if branch_name == final_target_branch:
                     continue
                 
+                if heads[branch_name] in settled_heads:
+                    continue
+                
                 # Check if this branch has commits that are not in final_target_branch
                 # but might be newer than after_merge_branch
                 try:
@@ -972,31 +1268,23 @@ Auto-merge enabled - {sprint_name}
                     if not commits:
                         continue
                     
-                    # ตรวจสอบว่า commits เหล่านี้มาจาก branches ก่อนหน้าใน flow หรือไม่
-                    unique_commits = []
-                    for commit in commits:
-                        is_from_previous_branch = False
-                        
-                        # ตรวจสอบกับ branches ก่อนหน้าใน flow
-                        for j in range(i):
-                            prev_branch = branch_flow[j]
-                            if not self.branch_exists(repo_name, prev_branch):
-                                continue
-                                
-                            try:
-                                prev_comparison = project.repository_compare(from_=prev_branch, to=current_branch)
-                                prev_commits = prev_comparison.get('commits', [])
-                                
-                                # ถ้า commit นี้อยู่ใน comparison จาก previous branch แสดงว่ามาจาก previous branch
-                                if any(prev_commit['id'] == commit['id'] for prev_commit in prev_commits):
-                                    is_from_previous_branch = True
-                                    break
-                            except GitlabGetError:
-                                continue
+                    # รวม commit id จาก comparison กับ branches ก่อนหน้าใน flow (compare ครั้งเดียวต่อ branch
+                    # ไม่ใช่ต่อ commit) แล้วกรอง commits ด้วย set lookup
+                    previous_commit_ids = set()
+                    for prev_branch in branch_flow[:i]:
+                        if not self.branch_exists(repo_name, prev_branch):
+                            continue
                         
-                        # ถ้า commit ไม่ได้มาจาก previous branches แสดงว่าเป็น commit ใหม่ใน intermediate branch
-                        if not is_from_previous_branch:
-                            unique_commits.append(commit)
+                        try:
+                            prev_comparison = project.repository_compare(from_=prev_branch, to=current_branch)
+                            previous_commit_ids.update(
+                                prev_commit['id'] for prev_commit in prev_comparison.get('commits', [])
+                            )
+                        except GitlabGetError:
+                            continue
+                    
+                    # ถ้า commit ไม่ได้มาจาก previous branches แสดงว่าเป็น commit ใหม่ใน intermediate branch
+                    unique_commits = [commit for commit in commits if commit['id'] not in previous_commit_ids]
                     
                     if unique_commits:
                         # สร้างรายละเอียด commits
@@ -1,94 +1,142 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import sys
 import time
 import logging
 import yaml
 import click
+from collections import defaultdict
 from dotenv import load_dotenv
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+from rich.live import Live
 from rich.table import Table
 from rich.panel import Panel
+from rich.style import Style
 from rich.text import Text
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 
-from gitlab_client import GitLabClient
-from discord_notifier import DiscordNotifier
-from mr_automation import MRAutomation
-from models import DeploymentPhase, MRStatus
+from config_loader import YAML_LOADER
+from error_handler import WorkflowStateManager
+from models import DeploymentPhase, MRStatus, group_repos_by_state
+
+# GitLab/Discord clients and the automation layer are imported where they are first needed,
+# so --help and argument errors don't pay for python-gitlab and requests
+if TYPE_CHECKING:
+    from gitlab_client import GitLabClient
+    from discord_notifier import DiscordNotifier
+    from mr_automation import MRAutomation
 
 # Load environment variables
 load_dotenv()
 
 console = Console()
+logger = logging.getLogger(__name__)
+
+# Branch fingerprints of repositories whose last additional-commits scan found nothing
+ADDITIONAL_SCAN_STATE_FILE = ".mr_bot_state.json"
+
+# Branches whose additional MRs are reported as intermediate commits
+INTERMEDIATE_BRANCHES = frozenset(('ss-dev', 'dev2'))
+
+# Status column icons for the MR status tables
+MR_STATUS_EMOJI = {
+    "pending": "⏸️",
+    "created": "⏳",
+    "existing": "📋",
+    "merged": "✅",
+    "failed": "❌",
+    "no_commits": "📭"
+}
+
+# repo:mr_id entries separated by commas; anything else lands in group 3 as an invalid spec
+_MR_SPEC_RE = re.compile(r'\s*(?:([^:,\s]+)\s*:\s*(\d+)|([^,]*?))\s*(?:,|$)')
+
+# GitLab clients keyed by (base_url, api_token, project_group) so every entry point
+# in this process shares one authenticated client and its pooled HTTP session
+_gitlab_clients: Dict[Tuple[str, str, str], 'GitLabClient'] = {}
+
+def get_gitlab_client(config: Dict, discord_notifier: Optional['DiscordNotifier'] = None) -> 'GitLabClient':
+    """Return the shared GitLab client for this config, creating it on first use"""
+    from gitlab_client import GitLabClient
+    
+    gitlab_config = config['gitlab']
+    key = (gitlab_config['base_url'], gitlab_config['api_token'], gitlab_config['project_group'])
+    
+    gitlab_client = _gitlab_clients.get(key)
+    if gitlab_client is None:
+        gitlab_client = _gitlab_clients[key] = GitLabClient(
+            *key, max_workers=config['automation'].get('max_workers', 8)
+        )
+    
+    if discord_notifier is not None:
+        gitlab_client.discord_notifier = discord_notifier
+    
+    return gitlab_client
 
 def debug_branch_status(config: Dict):
     """Debug function to check branch status and commits"""
     console.print(Panel("🔍 Branch Debug Mode", style="bold cyan"))
     
     # Initialize GitLab client
-    gitlab_config = config['gitlab']
-    gitlab_client = GitLabClient(
-        gitlab_config['base_url'],
-        gitlab_config['api_token'],
-        gitlab_config['project_group']
-    )
+    gitlab_client = get_gitlab_client(config)
     
     # Get all repositories
     all_repos = config['repositories']['libraries'] + config['repositories']['services']
     
     for repo in all_repos:
-        try:
-            console.print(f"\n[bold blue]🔍 Repository: {repo}[/bold blue]")
-            
-            # Get strategy and flow
-            strategy_found = False
-            flow = []
-            for strategy_name, strategy_config in config['branch_strategies'].items():
-                if repo in strategy_config['repos']:
-                    flow = strategy_config['flow']
-                    strategy_found = True
-                    console.print(f"  Strategy: {strategy_name}")
-                    console.print(f"  Flow: {' → '.join(flow)}")
-                    break
-            
-            if not strategy_found:
-                console.print("  [red]❌ No strategy found for this repository[/red]")
-                continue
-            
-            # Check each branch in flow
-            for i, branch in enumerate(flow):
-                exists = gitlab_client.branch_exists(repo, branch)
-                status = "✅ exists" if exists else "❌ missing"
-                console.print(f"  Branch {branch}: {status}")
+        # บัฟเฟอร์ output ของแต่ละ repo แล้วเขียนออกครั้งเดียวเมื่อจบ repo
+        with console:
+            try:
+                console.print(f"\n[bold blue]🔍 Repository: {repo}[/bold blue]")
                 
-                if exists and i < len(flow) - 1:
-                    next_branch = flow[i + 1]
-                    if gitlab_client.branch_exists(repo, next_branch):
-                        has_commits, count = gitlab_client.validate_commits(repo, branch, next_branch)
-                        if has_commits:
-                            console.print(f"    → {count} commits ahead of {next_branch}")
-                        else:
-                            console.print(f"    → no new commits vs {next_branch}")
-            
-            # Check for intermediate commits
-            if len(flow) >= 2:
-                console.print(f"  [yellow]Checking intermediate commits...[/yellow]")
-                intermediate_commits = gitlab_client.get_intermediate_branch_commits(repo, flow, flow[-1])
-                if intermediate_commits:
-                    for branch, (count, details) in intermediate_commits.items():
-                        console.print(f"    🔍 {branch}: {count} intermediate commits")
-                        for detail in details[:3]:  # Show first 3 commits
-                            console.print(f"      • {detail['short_id']}: {detail['message']}")
-                        if len(details) > 3:
-                            console.print(f"      ... and {len(details) - 3} more")
-                else:
-                    console.print(f"    ✅ No intermediate commits found")
+                # Get strategy and flow
+                strategy_found = False
+                flow = []
+                for strategy_name, strategy_config in config['branch_strategies'].items():
+                    if repo in strategy_config['repos']:
+                        flow = strategy_config['flow']
+                        strategy_found = True
+                        console.print(f"  Strategy: {strategy_name}")
+                        console.print(f"  Flow: {' → '.join(flow)}")
+                        break
+                
+                if not strategy_found:
+                    console.print("  [red]❌ No strategy found for this repository[/red]")
+                    continue
+                
+                # Check each branch in flow
+                for i, branch in enumerate(flow):
+                    exists = gitlab_client.branch_exists(repo, branch)
+                    status = "✅ exists" if exists else "❌ missing"
+                    console.print(f"  Branch {branch}: {status}")
                     
-        except Exception as e:
-            console.print(f"  [red]❌ Error checking {repo}: {e}[/red]")
+                    if exists and i < len(flow) - 1:
+                        next_branch = flow[i + 1]
+                        if gitlab_client.branch_exists(repo, next_branch):
+                            has_commits, count = gitlab_client.validate_commits(repo, branch, next_branch)
+                            if has_commits:
+                                console.print(f"    → {count} commits ahead of {next_branch}")
+                            else:
+                                console.print(f"    → no new commits vs {next_branch}")
+                
+                # Check for intermediate commits
+                if len(flow) >= 2:
+                    console.print(f"  [yellow]Checking intermediate commits...[/yellow]")
+                    intermediate_commits = gitlab_client.get_intermediate_branch_commits(repo, flow, flow[-1])
+                    if intermediate_commits:
+                        for branch, (count, details) in intermediate_commits.items():
+                            console.print(f"    🔍 {branch}: {count} intermediate commits")
+                            for detail in details[:3]:  # Show first 3 commits
+                                console.print(f"      • {detail['short_id']}: {detail['message']}")
+                            if len(details) > 3:
+                                console.print(f"      ... and {len(details) - 3} more")
+                    else:
+                        console.print(f"    ✅ No intermediate commits found")
+                    
+            except Exception as e:
+                console.print(f"  [red]❌ Error checking {repo}: {e}[/red]")
 
 def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, repo_filter: str = None, progressive_enabled: bool = True):
     """Process intermediate commits directly without requiring source branch commits"""
@@ -97,17 +145,14 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
     if dry_run:
         console.print("[yellow]Running in DRY RUN mode - no changes will be made[/yellow]")
     
+    from discord_notifier import DiscordNotifier
+    from mr_automation import MRAutomation
+    
     # Initialize clients
-    gitlab_config = config['gitlab']
     discord_webhook = config['discord']['webhook_url']
     discord_notifier = DiscordNotifier(discord_webhook, config)
     
-    gitlab_client = GitLabClient(
-        gitlab_config['base_url'],
-        gitlab_config['api_token'],
-        gitlab_config['project_group'],
-        discord_notifier
-    )
+    gitlab_client = get_gitlab_client(config, discord_notifier)
     
     automation = MRAutomation(gitlab_client, discord_notifier, config)
     
@@ -126,107 +171,107 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
         discord_notifier.send_deployment_start("intermediate", [], all_repos)
     
     all_mrs = []
+    stopped_at_wait = {}  # repo -> True when its MR targets a wait_for_deployment branch
     
     # Process each repository
     for repo in all_repos:
-        try:
-            console.print(f"\n[bold blue]🔍 Processing {repo}[/bold blue]")
-            
-            # Get strategy and flow
-            _, flow = automation.get_repository_strategy(repo)
-            
-            # Process each step in flow looking for commits to merge forward
-            # เพิ่มการตรวจสอบ dependency - ต้อง merge จาก branch แรกสุดก่อน
-            for i in range(len(flow) - 1):
-                source_branch = flow[i]
-                target_branch = flow[i + 1]
-                
-                # Skip if source branch doesn't exist
-                if not gitlab_client.branch_exists(repo, source_branch):
-                    console.print(f"  Branch {source_branch}: ❌ missing")
-                    continue
-                
-                # ตรวจสอบว่ามี branches ก่อนหน้าที่ยังมี commits ค้างอยู่หรือไม่
-                has_pending_previous_commits = False
-                if i > 0:  # ถ้าไม่ใช่ branch แรก
-                    for prev_i in range(i):  # ตรวจสอบ branches ก่อนหน้า
-                        prev_source = flow[prev_i]
-                        prev_target = flow[prev_i + 1]
-                        
-                        if (gitlab_client.branch_exists(repo, prev_source) and 
-                            gitlab_client.branch_exists(repo, prev_target)):
-                            prev_has_commits, prev_count = gitlab_client.validate_commits(repo, prev_source, prev_target)
-                            if prev_has_commits:
-                                console.print(f"  ⚠️  Skipping {source_branch} → {target_branch}: Previous branch {prev_source} → {prev_target} has {prev_count} unmerged commits")
-                                has_pending_previous_commits = True
-                                break
-                
-                if has_pending_previous_commits:
-                    continue
-                
-                # ตรวจสอบว่า target branch นี้ trigger environment ที่มี wait_for_deployment = true หรือไม่
-                should_stop_at_target = False
-                for env_name, env_config in config.get('environments', {}).items():
-                    triggered_by = env_config.get('triggered_by', [])
-                    wait_for_deployment = env_config.get('wait_for_deployment', False)
-                    if target_branch in triggered_by and wait_for_deployment:
-                        should_stop_at_target = True
-                        break
+        # บัฟเฟอร์ output ของแต่ละ repo แล้วเขียนออกครั้งเดียวเมื่อจบ repo (ลด write ทีละบรรทัด)
+        with console:
+            try:
+                console.print(f"\n[bold blue]🔍 Processing {repo}[/bold blue]")
                 
-                # Check for commits
-                has_commits, commit_count = gitlab_client.validate_commits(repo, source_branch, target_branch)
+                # Get strategy and flow
+                _, flow = automation.get_repository_strategy(repo)
                 
-                if has_commits:
-                    console.print(f"  {source_branch} → {target_branch}: ✅ {commit_count} commits")
+                # Process each step in flow looking for commits to merge forward
+                # เพิ่มการตรวจสอบ dependency - ต้อง merge จาก branch แรกสุดก่อน
+                for i in range(len(flow) - 1):
+                    source_branch = flow[i]
+                    target_branch = flow[i + 1]
                     
-                    if not dry_run:
-                        # Get commit details
-                        commit_details = gitlab_client.get_commit_details(repo, source_branch, target_branch)
-                        
-                        # Create MR (or use existing one)
-                        mr_result = gitlab_client.create_merge_request_with_commits(
-                            repo, source_branch, target_branch, "intermediate",
-                            commit_details, auto_merge=config['automation']['auto_merge']
-                        )
+                    # Skip if source branch doesn't exist
+                    if not gitlab_client.branch_exists(repo, source_branch):
+                        console.print(f"  Branch {source_branch}: ❌ missing")
+                        continue
+                    
+                    # ตรวจสอบว่ามี branches ก่อนหน้าที่ยังมี commits ค้างอยู่หรือไม่
+                    has_pending_previous_commits = False
+                    if i > 0:  # ถ้าไม่ใช่ branch แรก
+                        for prev_i in range(i):  # ตรวจสอบ branches ก่อนหน้า
+                            prev_source = flow[prev_i]
+                            prev_target = flow[prev_i + 1]
+                            
+                            if (gitlab_client.branch_exists(repo, prev_source) and 
+                                gitlab_client.branch_exists(repo, prev_target)):
+                                prev_has_commits, prev_count = gitlab_client.validate_commits(repo, prev_source, prev_target)
+                                if prev_has_commits:
+                                    console.print(f"  ⚠️  Skipping {source_branch} → {target_branch}: Previous branch {prev_source} → {prev_target} has {prev_count} unmerged commits")
+                                    has_pending_previous_commits = True
+                                    break
+                    
+                    if has_pending_previous_commits:
+                        continue
+                    
+                    # ตรวจสอบว่า target branch นี้ trigger environment ที่มี wait_for_deployment = true หรือไม่
+                    should_stop_at_target = False
+                    for env_name, env_config in config.get('environments', {}).items():
+                        triggered_by = env_config.get('triggered_by', [])
+                        wait_for_deployment = env_config.get('wait_for_deployment', False)
+                        if target_branch in triggered_by and wait_for_deployment:
+                            should_stop_at_target = True
+                            break
+                    
+                    # Check for commits
+                    has_commits, commit_count = gitlab_client.validate_commits(repo, source_branch, target_branch)
+                    
+                    if has_commits:
+                        console.print(f"  {source_branch} → {target_branch}: ✅ {commit_count} commits")
                         
-                        if mr_result:
-                            mr_status = MRStatus(
-                                repo_name=repo,
-                                source_branch=source_branch,
-                                target_branch=target_branch,
-                                mr_id=mr_result['id'],
-                                mr_url=mr_result['web_url'],
-                                state="created",
-                                commit_count=commit_count
+                        if not dry_run:
+                            # Create MR (or use existing one); commit details are only fetched for new MRs
+                            mr_result = gitlab_client.create_merge_request_with_commits(
+                                repo, source_branch, target_branch, "intermediate",
+                                auto_merge=config['automation']['auto_merge']
                             )
-                            all_mrs.append(mr_status)
                             
-                            if mr_result.get('existing'):
-                                console.print(f"    📋 Found existing MR: {mr_result['web_url']} (will monitor & merge)")
-                                mr_status.state = "existing"  # Mark as existing for table display
+                            if mr_result:
+                                is_existing = bool(mr_result.get('existing'))
+                                all_mrs.append(MRStatus(
+                                    repo_name=repo,
+                                    source_branch=source_branch,
+                                    target_branch=target_branch,
+                                    mr_id=mr_result['id'],
+                                    mr_url=mr_result['web_url'],
+                                    state="existing" if is_existing else "created",  # "existing" for table display
+                                    commit_count=commit_count
+                                ))
+                                
+                                if is_existing:
+                                    console.print(f"    📋 Found existing MR: {mr_result['web_url']} (will monitor & merge)")
+                                else:
+                                    console.print(f"    🚀 Created MR: {mr_result['web_url']}")
                             else:
-                                console.print(f"    🚀 Created MR: {mr_result['web_url']}")
+                                console.print(f"    ❌ Failed to create MR")
+                            
+                            # หยุดสร้าง MR เพิ่มเติมสำหรับ repo นี้เมื่อเจอ branch ที่มี commits หรือถึง deploy branch
+                            if should_stop_at_target:
+                                console.print(f"    ⏸️  Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
+                                stopped_at_wait[repo] = True
+                            break
                         else:
-                            console.print(f"    ❌ Failed to create MR")
-                        
-                        # หยุดสร้าง MR เพิ่มเติมสำหรับ repo นี้เมื่อเจอ branch ที่มี commits หรือถึง deploy branch
-                        if should_stop_at_target:
-                            console.print(f"    ⏸️  Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
-                        break
+                            console.print(f"    🚀 Would create MR: {source_branch} → {target_branch}")
+                            if should_stop_at_target:
+                                console.print(f"    ⏸️  Would stop at deploy branch {target_branch} due to wait_for_deployment=true")
+                            break  # ใน dry run mode ก็ต้อง break เพื่อแสดงว่าจะทำ sequential
                     else:
-                        console.print(f"    🚀 Would create MR: {source_branch} → {target_branch}")
+                        console.print(f"  {source_branch} → {target_branch}: ✅ up to date")
+                        # แม้ไม่มี commits ก็ยังต้องตรวจสอบว่าต้องหยุดที่ target branch นี้หรือไม่
                         if should_stop_at_target:
-                            console.print(f"    ⏸️  Would stop at deploy branch {target_branch} due to wait_for_deployment=true")
-                        break  # ใน dry run mode ก็ต้อง break เพื่อแสดงว่าจะทำ sequential
-                else:
-                    console.print(f"  {source_branch} → {target_branch}: ✅ up to date")
-                    # แม้ไม่มี commits ก็ยังต้องตรวจสอบว่าต้องหยุดที่ target branch นี้หรือไม่
-                    if should_stop_at_target:
-                        console.print(f"    ⏸️  Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
-                        break
+                            console.print(f"    ⏸️  Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
+                            break
                     
-        except Exception as e:
-            console.print(f"  [red]❌ Error processing {repo}: {e}[/red]")
+            except Exception as e:
+                console.print(f"  [red]❌ Error processing {repo}: {e}[/red]")
     
     # Display results
     if all_mrs:
@@ -235,10 +280,7 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
         if not dry_run:
             # Monitor MRs
             console.print("[blue]Monitoring merge requests...[/blue]")
-            monitored_mrs = automation.monitor_merge_requests(all_mrs)
-            
-            # Display final results
-            display_mr_status_table(monitored_mrs, "Final MR Status")
+            monitored_mrs = monitor_with_live_table(automation, all_mrs, "Final MR Status")
             
             successful_mrs = [mr for mr in monitored_mrs if mr.state == "merged"]
             failed_mrs = [mr for mr in monitored_mrs if mr.state == "failed"]
@@ -254,10 +296,13 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
             # หลังจาก merge สำเร็จ ตรวจสอบและสร้าง MR ต่อเนื่อง
             if successful_mrs:
                 console.print("\n[blue]สร้าง MR ต่อเนื่องไปจนถึงปลาย branch...[/blue]")
-                successful_repos = list(set(mr.repo_name for mr in successful_mrs))
+                successful_repos = list(dict.fromkeys(mr.repo_name for mr in successful_mrs))
+                
+                # repo ที่หยุดที่ deploy branch (wait_for_deployment=true) ต้องรอ deployment ก่อน ไม่ต้องสร้าง MR ต่อ
+                progressive_candidates = [repo for repo in successful_repos if not stopped_at_wait.get(repo, False)]
                 
                 # สร้าง MR ทั้งหมดตาม flow โดยไม่หยุดที่ ss-dev
-                progressive_mrs = automation.create_complete_flow_merge_requests(successful_repos, "complete_flow")
+                progressive_mrs = automation.create_complete_flow_merge_requests(progressive_candidates, "complete_flow")
                 
                 if progressive_mrs:
                     console.print(f"[green]✅ สร้าง MR ครบทั้ง flow เพิ่มอีก {len(progressive_mrs)} MR[/green]")
@@ -265,8 +310,9 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
                     
                     # Monitor progressive MRs
                     console.print("[blue]Monitoring progressive merge requests...[/blue]")
-                    monitored_progressive_mrs = automation.monitor_merge_requests(progressive_mrs)
-                    display_mr_status_table(monitored_progressive_mrs, "Progressive MRs - Final Status")
+                    monitored_progressive_mrs = monitor_with_live_table(
+                        automation, progressive_mrs, "Progressive MRs - Final Status"
+                    )
                     
                     # Add to final counts
                     progressive_successful = [mr for mr in monitored_progressive_mrs if mr.state == "merged"]
@@ -294,39 +340,37 @@ def process_intermediate_commits_directly(config: Dict, dry_run: bool = False, r
     else:
         console.print("[green]✅ All branches are up to date - no intermediate commits found[/green]")
 
+def _parse_mr_specs(spec_str: str) -> List[Tuple[str, int]]:
+    """Parse a repo:mr_id,repo:mr_id string in one regex pass, reporting invalid entries"""
+    mr_specs = []
+    for match in _MR_SPEC_RE.finditer(spec_str):
+        repo, mr_id, invalid = match.groups()
+        if repo:
+            mr_specs.append((repo, int(mr_id)))
+        elif ':' in invalid:
+            console.print(f"[red]❌ Invalid MR ID: {invalid}[/red]")
+        elif invalid:
+            console.print(f"[red]❌ Invalid format: {invalid} (expected: repo:mr_id)[/red]")
+    
+    return mr_specs
+
 def enable_auto_merge_mrs(config: Dict, force_merge_str: str):
     """Enable auto-merge for specified MRs"""
     console.print(Panel("🚀 Enabling Auto-Merge for MRs", style="bold green"))
     
     # Parse force merge string (format: repo:mr_id,repo:mr_id)
-    mr_specs = []
-    for spec in force_merge_str.split(','):
-        if ':' in spec:
-            repo, mr_id = spec.strip().split(':', 1)
-            try:
-                mr_specs.append((repo, int(mr_id)))
-            except ValueError:
-                console.print(f"[red]❌ Invalid MR ID: {spec}[/red]")
-        else:
-            console.print(f"[red]❌ Invalid format: {spec} (expected: repo:mr_id)[/red]")
+    mr_specs = _parse_mr_specs(force_merge_str)
     
     if not mr_specs:
         console.print("[red]❌ No valid MR specs found[/red]")
         return
     
     # Initialize GitLab client
-    gitlab_config = config['gitlab']
-    gitlab_client = GitLabClient(
-        gitlab_config['base_url'],
-        gitlab_config['api_token'],
-        gitlab_config['project_group']
-    )
+    gitlab_client = get_gitlab_client(config)
     
     # Group by repository
-    repo_mrs = {}
+    repo_mrs = defaultdict(list)
     for repo, mr_id in mr_specs:
-        if repo not in repo_mrs:
-            repo_mrs[repo] = []
         repo_mrs[repo].append(mr_id)
     
     # Force merge per repository
@@ -354,34 +398,18 @@ def directly_merge_mrs(config: Dict, merge_str: str):
     console.print(Panel("🚀 Directly Merging MRs", style="bold green"))
     
     # Parse merge string (format: repo:mr_id,repo:mr_id)
-    mr_specs = []
-    for spec in merge_str.split(','):
-        if ':' in spec:
-            repo, mr_id = spec.strip().split(':', 1)
-            try:
-                mr_specs.append((repo, int(mr_id)))
-            except ValueError:
-                console.print(f"[red]❌ Invalid MR ID: {spec}[/red]")
-        else:
-            console.print(f"[red]❌ Invalid format: {spec} (expected: repo:mr_id)[/red]")
+    mr_specs = _parse_mr_specs(merge_str)
     
     if not mr_specs:
         console.print("[red]❌ No valid MR specs found[/red]")
         return
     
     # Initialize GitLab client
-    gitlab_config = config['gitlab']
-    gitlab_client = GitLabClient(
-        gitlab_config['base_url'],
-        gitlab_config['api_token'],
-        gitlab_config['project_group']
-    )
+    gitlab_client = get_gitlab_client(config)
     
     # Group by repository
-    repo_mrs = {}
+    repo_mrs = defaultdict(list)
     for repo, mr_id in mr_specs:
-        if repo not in repo_mrs:
-            repo_mrs[repo] = []
         repo_mrs[repo].append(mr_id)
     
     # Merge per repository
@@ -438,8 +466,8 @@ def setup_logging(log_level: str, log_file: str):
 
 def load_config(config_path: str) -> Dict:
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        with open(config_path, 'rb') as f:
+            config = yaml.load(f, Loader=YAML_LOADER)
         
         # Replace environment variables
         def replace_env_vars(obj):
@@ -480,7 +508,7 @@ def display_repository_summary(libraries: List[str], services: List[str]):
     
     console.print(table)
 
-def display_mr_status_table(mr_statuses: List[MRStatus], title: str):
+def build_mr_status_table(mr_statuses: List[MRStatus], title: str) -> Table:
     table = Table(title=title, show_header=True, header_style="bold blue")
     table.add_column("Repository", style="cyan")
     table.add_column("Source → Target", style="green")
@@ -488,24 +516,31 @@ def display_mr_status_table(mr_statuses: List[MRStatus], title: str):
     table.add_column("Commits", style="magenta", justify="center")
     table.add_column("MR Link", style="blue")
     
+    # The table is rebuilt on every live update, so cells are plain Text objects
+    # (no markup parsing) and the link is set through a Style instead of [link] markup
     for mr in mr_statuses:
-        status_emoji = {
-            "pending": "⏸️",
-            "created": "⏳",
-            "existing": "📋",
-            "merged": "✅",
-            "failed": "❌",
-            "no_commits": "📭"
-        }.get(mr.state, "❓")
+        status_text = Text(f"{MR_STATUS_EMOJI.get(mr.state, '❓')} {mr.state}")
+        branch_text = Text(f"{mr.source_branch} → {mr.target_branch}")
+        commits_text = Text(str(mr.commit_count) if mr.commit_count > 0 else "-")
+        link_text = Text("View MR", style=Style(link=mr.mr_url)) if mr.mr_url else Text("-")
         
-        status_text = f"{status_emoji} {mr.state}"
-        branch_text = f"{mr.source_branch} → {mr.target_branch}"
-        commits_text = str(mr.commit_count) if mr.commit_count > 0 else "-"
-        link_text = f"[link={mr.mr_url}]View MR[/link]" if mr.mr_url else "-"
-        
-        table.add_row(mr.repo_name, branch_text, status_text, commits_text, link_text)
+        table.add_row(Text(mr.repo_name), branch_text, status_text, commits_text, link_text)
     
-    console.print(table)
+    return table
+
+def display_mr_status_table(mr_statuses: List[MRStatus], title: str):
+    console.print(build_mr_status_table(mr_statuses, title))
+
+def monitor_with_live_table(automation: 'MRAutomation', mr_statuses: List[MRStatus], title: str) -> List[MRStatus]:
+    """Monitor MRs while a live status table is redrawn whenever an MR reaches its final state"""
+    with Live(build_mr_status_table(mr_statuses, title), console=console, refresh_per_second=4) as live:
+        monitored_mrs = automation.monitor_merge_requests(
+            mr_statuses,
+            on_update=lambda _: live.update(build_mr_status_table(mr_statuses, title))
+        )
+        live.update(build_mr_status_table(monitored_mrs, title))
+    
+    return monitored_mrs
 
 class MRDeploymentOrchestrator:
     def __init__(self, config: Dict, dry_run: bool = False, check_additional_commits: bool = True):
@@ -514,17 +549,15 @@ class MRDeploymentOrchestrator:
         self.check_additional_commits = check_additional_commits
         self.start_time = time.time()
         
+        from discord_notifier import DiscordNotifier
+        from mr_automation import MRAutomation
+        
         # Initialize clients
-        gitlab_config = config['gitlab']
+        # discord.batch decides whether notifications are posted from a background thread
         discord_webhook = config['discord']['webhook_url']
         self.discord_notifier = DiscordNotifier(discord_webhook, config)
         
-        self.gitlab_client = GitLabClient(
-            gitlab_config['base_url'],
-            gitlab_config['api_token'],
-            gitlab_config['project_group'],
-            self.discord_notifier
-        )
+        self.gitlab_client = get_gitlab_client(config, self.discord_notifier)
         
         self.automation = MRAutomation(self.gitlab_client, self.discord_notifier, config)
         
@@ -595,6 +628,8 @@ class MRDeploymentOrchestrator:
             console.print(f"[yellow]Would deploy {len(repos)} {phase_name.lower()} repositories[/yellow]")
             return True
         
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+        
         try:
             # Create MRs for this phase
             with Progress(
@@ -619,14 +654,12 @@ class MRDeploymentOrchestrator:
             
             # Monitor MRs
             console.print(f"[blue]Monitoring {phase_name.lower()} merge requests...[/blue]")
-            mr_statuses = self.automation.monitor_merge_requests(mr_statuses)
-            
-            # Update display
-            display_mr_status_table(mr_statuses, f"{phase_name} Results")
+            mr_statuses = monitor_with_live_table(self.automation, mr_statuses, f"{phase_name} Results")
             
             # Get successful repos
-            successful_repos = [mr.repo_name for mr in mr_statuses if mr.state == "merged"]
-            failed_repos = [mr.repo_name for mr in mr_statuses if mr.state == "failed"]
+            repos_by_state = group_repos_by_state(mr_statuses)
+            successful_repos = repos_by_state["merged"]
+            failed_repos = repos_by_state["failed"]
             
             # Send phase completion
             progress_info = self.automation.get_deployment_progress(mr_statuses, phase)
@@ -689,10 +722,42 @@ class MRDeploymentOrchestrator:
             
             console.print(f"[blue]Scanning for branches with commits between {current_target_branch} and {final_target_branch}...[/blue]")
             
+            # ข้าม repo ที่ไม่มี branch ไหนเปลี่ยนตั้งแต่การ scan ครั้งก่อนที่ไม่พบ additional commits
+            scan_key = f"{current_target_branch}->{final_target_branch}"
+            state_manager = WorkflowStateManager(ADDITIONAL_SCAN_STATE_FILE)
+            scan_state = state_manager.load_state()
+            known_clean = scan_state.setdefault(scan_key, {})
+            fingerprints = self.automation.get_branch_fingerprints(successful_repos)
+            
+            repos_to_scan = [repo for repo in successful_repos
+                             if repo not in fingerprints or known_clean.get(repo) != fingerprints[repo]]
+            skipped_repos = len(successful_repos) - len(repos_to_scan)
+            if skipped_repos:
+                console.print(f"[dim]Skipping {skipped_repos} repositories with no branch changes since the last clean scan[/dim]")
+            
             # Process additional commits
-            additional_mrs = self.automation.process_additional_commits(
-                successful_repos, current_target_branch, final_target_branch, "additional"
-            )
+            additional_mrs, scan_errors = self.automation.process_additional_commits(
+                repos_to_scan, current_target_branch, final_target_branch, "additional"
+            ) if repos_to_scan else ([], {})
+            
+            # repo ที่ scan ไม่สำเร็จจะถูกรายงานแต่ไม่หยุดการประมวลผล repo อื่น
+            if scan_errors:
+                console.print(f"[yellow]Could not scan {len(scan_errors)} repositories for additional commits:[/yellow]")
+                for repo, error in scan_errors.items():
+                    console.print(f"  • {repo}: {error}")
+                self.discord_notifier.send_critical_failure(
+                    "Additional commits scan failed for: " + ", ".join(scan_errors)
+                )
+            
+            # จำ fingerprint ของ repo ที่ scan แล้วไม่พบอะไร เพื่อข้ามในรอบถัดไป
+            # (repo ที่ scan ไม่สำเร็จต้องถูก scan ใหม่ในรอบถัดไป)
+            repos_with_mrs = {mr.repo_name for mr in additional_mrs}
+            for repo in repos_to_scan:
+                if repo in fingerprints and repo not in repos_with_mrs and repo not in scan_errors:
+                    known_clean[repo] = fingerprints[repo]
+                else:
+                    known_clean.pop(repo, None)
+            state_manager.save_state(scan_state)
             
             if additional_mrs:
                 console.print(f"[green]Found {len(additional_mrs)} additional branches with commits[/green]")
@@ -702,14 +767,22 @@ class MRDeploymentOrchestrator:
                 
                 # Monitor additional MRs
                 console.print("[blue]Monitoring additional merge requests...[/blue]")
-                monitored_mrs = self.automation.monitor_merge_requests(additional_mrs)
-                
-                # Display final results
-                display_mr_status_table(monitored_mrs, "Additional MRs - Final Status")
+                monitored_mrs = monitor_with_live_table(
+                    self.automation, additional_mrs, "Additional MRs - Final Status"
+                )
                 
                 # Send notification about additional commits
-                successful_additional = [mr.repo_name for mr in monitored_mrs if mr.state == "merged"]
-                failed_additional = [mr.repo_name for mr in monitored_mrs if mr.state == "failed"]
+                # Tally results and intermediate-branch MRs in one pass
+                # (monitoring updates additional_mrs in place, so this covers both lists)
+                successful_additional, failed_additional = [], []
+                intermediate_count = 0
+                for mr in monitored_mrs:
+                    if mr.state == "merged":
+                        successful_additional.append(mr.repo_name)
+                    elif mr.state == "failed":
+                        failed_additional.append(mr.repo_name)
+                    if mr.source_branch in INTERMEDIATE_BRANCHES:
+                        intermediate_count += 1
                 
                 if successful_additional:
                     console.print(f"[green]Successfully merged additional commits from {len(successful_additional)} branches[/green]")
@@ -717,9 +790,6 @@ class MRDeploymentOrchestrator:
                 if failed_additional:
                     console.print(f"[yellow]Failed to merge additional commits from {len(failed_additional)} branches[/yellow]")
                 
-                # Count intermediate commits for better reporting
-                intermediate_count = sum(1 for mr in additional_mrs if mr.source_branch in ['ss-dev', 'dev2'])
-                
                 # Send Discord notification
                 self.discord_notifier.send_additional_commits_update(
                     "additional", len(additional_mrs), successful_additional, failed_additional, intermediate_count
@@ -807,6 +877,7 @@ def main(target: str, libraries_only: bool, dry_run: bool,
     # Run deployment
     console.print(f"[green]Starting deployment[/green]")
     success = orchestrator.run_deployment(target, libraries_only)
+    orchestrator.discord_notifier.flush()
     
     if success:
         console.print(Panel("✅ Deployment completed successfully!", 
@@ -1,4 +1,6 @@
-from typing import List, Optional, Literal
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Literal
 from dataclasses import dataclass
 from enum import Enum
 
@@ -6,11 +8,17 @@ from enum import Enum
 MRState = Literal["pending", "created", "existing", "merged", "failed", "no_commits"]
 EnvironmentName = Literal["dev2", "sit2", "all"]
 
+# States in which an MR is open and still has to be monitored
+ACTIVE_STATES = frozenset(("created", "existing"))
+
+# __slots__ dataclasses (no per-instance __dict__) need Python 3.10+; older interpreters keep plain dataclasses
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class DeploymentPhase(Enum):
     LIBRARIES = "libraries"
     SERVICES = "services"
 
-@dataclass
+@dataclass(**SLOTS)
 class MRStatus:
     """Status tracking for a merge request."""
     repo_name: str
@@ -35,9 +43,9 @@ class MRStatus:
     @property
     def is_active(self) -> bool:
         """Check if MR is actively being processed."""
-        return self.state in ["created", "existing"]
+        return self.state in ACTIVE_STATES
 
-@dataclass
+@dataclass(**SLOTS)
 class DeploymentProgress:
     """Progress tracking for deployment phases."""
     phase: DeploymentPhase
@@ -50,7 +58,8 @@ class DeploymentProgress:
     @property
     def total_repos(self) -> int:
         """Total number of repositories in this deployment."""
-        return len(self.completed_repos + self.failed_repos + self.in_progress_repos + self.pending_repos)
+        return (len(self.completed_repos) + len(self.failed_repos) + 
+                len(self.in_progress_repos) + len(self.pending_repos))
     
     @property
     def success_rate(self) -> float:
@@ -62,4 +71,11 @@ class DeploymentProgress:
     @property
     def is_complete(self) -> bool:
         """Check if deployment phase is complete."""
-        return len(self.in_progress_repos) == 0 and len(self.pending_repos) == 0
\ No newline at end of file
+        return len(self.in_progress_repos) == 0 and len(self.pending_repos) == 0
+
+def group_repos_by_state(mr_statuses: List[MRStatus]) -> Dict[str, List[str]]:
+    """Column view of MR statuses: repository names bucketed by state in a single pass."""
+    repos_by_state = defaultdict(list)
+    for mr in mr_statuses:
+        repos_by_state[mr.state].append(mr.repo_name)
+    return repos_by_state
@@ -1,12 +1,18 @@
+import hashlib
+import json
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
 from gitlab_client import GitLabClient
-from models import DeploymentPhase, MRStatus, DeploymentProgress
+from models import DeploymentPhase, MRStatus, DeploymentProgress, group_repos_by_state
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 class MRAutomation:
     def __init__(self, gitlab_client: GitLabClient, discord_notifier, config: Dict):
         self.gitlab = gitlab_client
@@ -14,212 +20,321 @@ class MRAutomation:
         self.config = config
         self.mr_statuses: List[MRStatus] = []
         
+        # repo -> (strategy_name, flow, source_branch) สร้างครั้งเดียวแทนการวนหา strategy ทุกครั้งที่เรียก
+        # (strategy แรกที่มี repo นั้นเป็นตัวที่ใช้ เหมือนการวนหาแบบเดิม)
+        self._repo_strategies: Dict[str, Tuple[str, List[str], str]] = {}
+        # strategy_name -> {branch: ตำแหน่งใน flow} ใช้แทน flow.index(branch) (ตำแหน่งแรกถ้า branch ซ้ำ เหมือน list.index)
+        self._branch_positions: Dict[str, Dict[str, int]] = {}
+        for strategy_name, strategy_config in config['branch_strategies'].items():
+            self._branch_positions[strategy_name] = {
+                branch: i for i, branch in reversed(list(enumerate(strategy_config['flow'])))
+            }
+            for repo in strategy_config['repos']:
+                self._repo_strategies.setdefault(
+                    repo, (strategy_name, strategy_config['flow'], strategy_config['source_branch'])
+                )
+        
+        # branch -> environment ที่ถูก trigger โดย branch นั้น (environment แรกที่พบเหมือนการวนหาแบบเดิม)
+        self._branch_to_env: Dict[str, str] = {}
+        for env_name, env_config in config.get('environments', {}).items():
+            for branch in env_config['triggered_by']:
+                self._branch_to_env.setdefault(branch, env_name)
+        # branches ที่ trigger environment ซึ่ง wait_for_deployment = true (ต้องหยุดสร้าง MR ต่อที่ branch นี้)
+        self._wait_branches = frozenset(
+            branch
+            for env_config in config.get('environments', {}).values()
+            if env_config.get('wait_for_deployment', False)
+            for branch in env_config.get('triggered_by', [])
+        )
+        # strategy_name -> [(source, target, ต้องหยุดที่ target หรือไม่)] ของแต่ละ step ใน flow
+        # repos ที่ใช้ strategy เดียวกันใช้ list เดียวกัน ไม่ต้องจับคู่ branch และตรวจ deploy branch ซ้ำทุก repo
+        self._flow_steps: Dict[str, List[Tuple[str, str, bool]]] = {
+            strategy_name: [
+                (source, target, target in self._wait_branches)
+                for source, target in zip(strategy_config['flow'], strategy_config['flow'][1:])
+            ]
+            for strategy_name, strategy_config in config['branch_strategies'].items()
+        }
+        
+        # ค่า config ที่ใช้ทุกครั้งที่สร้าง MR อ่านครั้งเดียว
+        self._auto_merge: bool = config['automation']['auto_merge']
+        
+        self._library_set = frozenset(config['repositories']['libraries'])
+        self._service_set = frozenset(config['repositories']['services'])
+        
+        # (repo, branch) ที่ยืนยันแล้วว่ามีอยู่; branch ถูกตรวจซ้ำหลายครั้งในแต่ละ phase จึงเก็บไว้ตลอดการทำงานรอบนี้
+        # เก็บเฉพาะผลที่มีอยู่ เพราะ "ไม่มี" อาจมาจาก API error ชั่วคราว หรือ branch ถูกสร้างระหว่างรอบ
+        self._branch_exists_cache: Set[Tuple[str, str]] = set()
+        
+        # repo -> (source_branch, target_branch) ของ phase ที่ได้จาก validate_repositories_with_strategies
+        # เพื่อให้การสร้าง MR ไม่ต้องหา branch จาก strategy ซ้ำ
+        self._repo_plans: Dict[str, Tuple[str, str]] = {}
+        # (repo, source_branch, target_branch) -> commit_count ที่ได้จากการ validate ล่าสุด
+        self._validated_commits: Dict[Tuple[str, str, str], int] = {}
+        # (repo, source_sha, target_sha) -> source merged into target หรือไม่
+        # ผลขึ้นกับ commit ทั้งสองฝั่งเท่านั้น จึงใช้ซ้ำได้ตลอดการทำงานรอบนี้
+        self._merged_cache: Dict[Tuple[str, str, str], bool] = {}
+        # (repo, source_branch, target_branch) -> ผล validate_commits ภายในการเรียก create_* หนึ่งครั้ง
+        # (ล้างทุกครั้งที่เริ่ม create_* ใหม่ เพราะ branch อาจมี commit เพิ่มระหว่างรอบ)
+        self._commits_cache: Dict[Tuple[str, str, str], Tuple[bool, int]] = {}
+        # repo -> {branch: head SHA} ภายในการเรียก create_* หนึ่งครั้ง (ล้างพร้อม _commits_cache)
+        self._repo_heads: Dict[str, Dict[str, str]] = {}
+        # project_id -> {(source, target)} ของ MR ที่เปิดอยู่ทั้ง group (ดึงครั้งเดียวต่อการเรียก create_*)
+        self._open_mr_index: Optional[Dict[int, Set[Tuple[str, str]]]] = None
+        # (repo, source_branch, target_branch) -> head SHA ของ source ตอนที่สร้างหรือพบ MR ที่เปิดอยู่ (ตลอดการทำงานรอบนี้)
+        # ถ้า source ยังอยู่ที่ commit เดิม MR นั้นยังครอบคลุม commits ทั้งหมด จึงไม่ต้องถาม GitLab ซ้ำ
+        # เก็บเฉพาะ MR ที่เปิดอยู่: คู่ที่ไม่อยู่ในรายการ MR ที่เปิดอยู่รอบถัดไป (merge หรือปิดไปแล้ว) จะถูกลบออก
+        self._known_mrs: Dict[Tuple[str, str, str], str] = {}
+        
+    def _run_per_repo(self, func: Callable[[str], T], repos: List[str]) -> List[T]:
+        """
+        เรียก func กับแต่ละ repo แบบขนาน (งานส่วนใหญ่รอ GitLab API) โดยคงลำดับผลลัพธ์ตาม repos
+        func ต้องจัดการ exception ของตัวเอง
+        """
+        if len(repos) <= 1:
+            return [func(repo) for repo in repos]
+        
+        with ThreadPoolExecutor(max_workers=self.config['automation'].get('max_workers', 8)) as executor:
+            return list(executor.map(func, repos))
+    
+    def _branch_exists(self, repo_name: str, branch_name: str) -> bool:
+        key = (repo_name, branch_name)
+        if key in self._branch_exists_cache:
+            return True
+        
+        exists = self.gitlab.branch_exists(repo_name, branch_name)
+        if exists:
+            self._branch_exists_cache.add(key)
+        return exists
+    
+    def _validate_commits(self, repo_name: str, source_branch: str, target_branch: str) -> Tuple[bool, int]:
+        key = (repo_name, source_branch, target_branch)
+        result = self._commits_cache.get(key)
+        if result is None:
+            result = self._commits_cache[key] = self.gitlab.validate_commits(repo_name, source_branch, target_branch)
+        return result
+    
+    def _get_branch_heads(self, repo_name: str) -> Dict[str, str]:
+        heads = self._repo_heads.get(repo_name)
+        if heads is None:
+            heads = self._repo_heads[repo_name] = self.gitlab.get_branch_heads(repo_name)
+        return heads
+    
+    def invalidate_branch_cache(self, repo_name: str):
+        """ลบผล branch_exists ที่ cache ไว้ของ repo (เช่น หลังสร้างหรือลบ branch)"""
+        for key in [key for key in self._branch_exists_cache if key[0] == repo_name]:
+            self._branch_exists_cache.discard(key)
+    
     def get_repository_strategy(self, repo_name: str) -> Tuple[str, List[str]]:
-        for strategy_name, strategy_config in self.config['branch_strategies'].items():
-            if repo_name in strategy_config['repos']:
-                return strategy_name, strategy_config['flow']
+        strategy = self._repo_strategies.get(repo_name)
+        if strategy is None:
+            raise ValueError(f"No strategy found for repository: {repo_name}")
         
-        raise ValueError(f"No strategy found for repository: {repo_name}")
+        return strategy[0], strategy[1]
     
     def get_repository_source_branch(self, repo_name: str) -> str:
-        for strategy_name, strategy_config in self.config['branch_strategies'].items():
-            if repo_name in strategy_config['repos']:
-                return strategy_config['source_branch']
+        strategy = self._repo_strategies.get(repo_name)
+        if strategy is None:
+            raise ValueError(f"No strategy found for repository: {repo_name}")
         
-        raise ValueError(f"No strategy found for repository: {repo_name}")
+        return strategy[2]
+    
+    def _branch_position(self, repo_name: str, branch_name: str) -> int:
+        """ตำแหน่งของ branch ใน flow ของ repo หรือ -1 ถ้าไม่อยู่ใน flow"""
+        strategy_name, _ = self.get_repository_strategy(repo_name)
+        return self._branch_positions[strategy_name].get(branch_name, -1)
     
     def get_next_branch(self, repo_name: str, current_branch: str) -> Optional[str]:
         _, flow = self.get_repository_strategy(repo_name)
         
-        try:
-            current_index = flow.index(current_branch)
-            if current_index < len(flow) - 1:
-                return flow[current_index + 1]
-        except ValueError:
+        current_index = self._branch_position(repo_name, current_branch)
+        if current_index < 0:
             logger.error(f"Branch {current_branch} not found in flow for {repo_name}")
+        elif current_index < len(flow) - 1:
+            return flow[current_index + 1]
         
         return None
     
     def order_repositories(self, repos: List[str]) -> Tuple[List[str], List[str]]:
-        libraries = [repo for repo in repos if repo in self.config['repositories']['libraries']]
-        services = [repo for repo in repos if repo in self.config['repositories']['services']]
-        
         # Order within categories based on config order
-        ordered_libraries = [repo for repo in self.config['repositories']['libraries'] if repo in libraries]
-        ordered_services = [repo for repo in self.config['repositories']['services'] if repo in services]
+        repo_set = set(repos)
+        ordered_libraries = [repo for repo in self.config['repositories']['libraries'] if repo in repo_set]
+        ordered_services = [repo for repo in self.config['repositories']['services'] if repo in repo_set]
         
         return ordered_libraries, ordered_services
     
     def validate_repositories(self, repos: List[str], source_branch: str) -> List[str]:
-        valid_repos = []
+        return self._repos_with_new_commits(self._plan_repositories(repos, source_branch))
+    
+    def validate_repositories_with_strategies(self, repos: List[str]) -> List[str]:
+        plans = self._plan_repositories(repos)
+        self._repo_plans.update((repo, branches) for repo, branches in plans.items() if branches)
+        return self._repos_with_new_commits(plans)
+    
+    def _plan_repositories(self, repos: List[str],
+                           source_branch: Optional[str] = None) -> Dict[str, Optional[Tuple[str, str]]]:
+        """
+        หา (source_branch, target_branch) ของแต่ละ repo และตรวจว่าทั้งสอง branch มีอยู่จริง
+        
+        Args:
+            repos: รายการ repositories
+            source_branch: source branch ที่ใช้กับทุก repo หรือ None เพื่อใช้ source branch จาก strategy ของแต่ละ repo
         
-        for repo in repos:
+        Returns:
+            Dictionary mapping repo_name to (source_branch, target_branch) หรือ None ถ้า repo ไม่ผ่านการตรวจ
+        """
+        def plan(repo: str) -> Optional[Tuple[str, str]]:
             try:
-                # Check if source branch exists
-                if not self.gitlab.branch_exists(repo, source_branch):
-                    logger.warning(f"Source branch {source_branch} does not exist in {repo}")
-                    continue
-                
-                # Get target branch for this repo
+                # หา branch จาก config ก่อน (ไม่ต้องเรียก API) แล้วค่อยตรวจกับ GitLab
+                repo_source_branch = source_branch or self.get_repository_source_branch(repo)
                 _, flow = self.get_repository_strategy(repo)
-                source_index = flow.index(source_branch)
+                source_index = self._branch_position(repo, repo_source_branch)
+                if source_index < 0:
+                    logger.warning(f"Source branch {repo_source_branch} not found in flow for {repo}")
+                    return None
+                
                 if source_index >= len(flow) - 1:
-                    logger.warning(f"Source branch {source_branch} is already the final branch in {repo}")
-                    continue
+                    logger.warning(f"Source branch {repo_source_branch} is already the final branch in {repo}")
+                    return None
                 
                 target_branch = flow[source_index + 1]
                 
+                # Check if source branch exists
+                if not self._branch_exists(repo, repo_source_branch):
+                    logger.warning(f"Source branch {repo_source_branch} does not exist in {repo}")
+                    return None
+                
                 # Check if target branch exists
-                if not self.gitlab.branch_exists(repo, target_branch):
+                if not self._branch_exists(repo, target_branch):
                     logger.warning(f"Target branch {target_branch} does not exist in {repo}")
-                    continue
-                
-                # Check for new commits
-                has_commits, commit_count = self.gitlab.validate_commits(repo, source_branch, target_branch)
-                if not has_commits:
-                    logger.info(f"No new commits in {repo} from {source_branch} to {target_branch}")
-                    continue
+                    return None
                 
-                valid_repos.append(repo)
-                logger.info(f"Repository {repo} is valid for deployment ({commit_count} commits)")
+                return repo_source_branch, target_branch
                 
             except Exception as e:
                 logger.error(f"Failed to validate repository {repo}: {e}")
-                continue
+                return None
         
-        return valid_repos
+        # Each repository is checked independently, so validate them concurrently
+        return dict(zip(repos, self._run_per_repo(plan, repos)))
     
-    def validate_repositories_with_strategies(self, repos: List[str]) -> List[str]:
-        valid_repos = []
+    def _repos_with_new_commits(self, plans: Dict[str, Optional[Tuple[str, str]]]) -> List[str]:
+        """
+        ตรวจสอบ commits ของทุก repo ที่ผ่านการตรวจ branch แล้วใน batch เดียว
         
-        for repo in repos:
-            try:
-                # Get source branch for this repo from strategy
-                source_branch = self.get_repository_source_branch(repo)
-                
-                # Check if source branch exists
-                if not self.gitlab.branch_exists(repo, source_branch):
-                    logger.warning(f"Source branch {source_branch} does not exist in {repo}")
-                    continue
-                
-                # Get target branch for this repo
-                _, flow = self.get_repository_strategy(repo)
-                try:
-                    source_index = flow.index(source_branch)
-                except ValueError:
-                    logger.warning(f"Source branch {source_branch} not found in flow for {repo}")
-                    continue
-                    
-                if source_index >= len(flow) - 1:
-                    logger.warning(f"Source branch {source_branch} is already the final branch in {repo}")
-                    continue
-                
-                target_branch = flow[source_index + 1]
-                
-                # Check if target branch exists
-                if not self.gitlab.branch_exists(repo, target_branch):
-                    logger.warning(f"Target branch {target_branch} does not exist in {repo}")
-                    continue
-                
-                # Check for new commits
-                has_commits, commit_count = self.gitlab.validate_commits(repo, source_branch, target_branch)
-                if not has_commits:
-                    logger.info(f"No new commits in {repo} from {source_branch} to {target_branch}")
-                    continue
-                
-                valid_repos.append(repo)
-                logger.info(f"Repository {repo} is valid for deployment ({commit_count} commits)")
-                
-            except Exception as e:
-                logger.error(f"Failed to validate repository {repo}: {e}")
+        Args:
+            plans: repo -> (source_branch, target_branch) หรือ None ถ้า repo ไม่ผ่านการตรวจ
+        
+        Returns:
+            รายการ repo ที่มี commits ใหม่ ตามลำดับเดิม
+        """
+        queries = [(repo, *branches) for repo, branches in plans.items() if branches]
+        results = self.gitlab.batch_validate_commits(
+            queries, max_workers=self.config['automation'].get('max_workers', 8)
+        )
+        
+        valid_repos = []
+        for query in queries:
+            repo, source_branch, target_branch = query
+            # ตรวจไม่สำเร็จ ถือว่าไม่มี commits ใหม่ในรอบนี้ (เหมือน validate_commits)
+            has_commits, commit_count = results.get(query, (False, 0))
+            self._validated_commits[query] = commit_count
+            if not has_commits:
+                logger.info(f"No new commits in {repo} from {source_branch} to {target_branch}")
                 continue
+            
+            valid_repos.append(repo)
+            logger.info(f"Repository {repo} is valid for deployment ({commit_count} commits)")
         
         return valid_repos
     
     def create_merge_requests_for_phase(self, repos: List[str], phase: DeploymentPhase) -> List[MRStatus]:
-        phase_mrs = []
-        
-        for repo in repos:
-            try:
-                # Get source branch for this repo from strategy
+        # Repositories within a phase don't depend on each other (libraries -> services is the
+        # only ordering constraint and is enforced between phases), so create their MRs concurrently
+        return self._run_per_repo(lambda repo: self._create_phase_merge_request(repo, phase), repos)
+    
+    def _create_phase_merge_request(self, repo: str, phase: DeploymentPhase) -> MRStatus:
+        # ใช้ branch ที่หาไว้ตอน validate ถ้ามี ไม่เช่นนั้นหาจาก strategy
+        source_branch, target_branch = self._repo_plans.get(repo, ("unknown", "unknown"))
+        try:
+            if repo not in self._repo_plans:
                 source_branch = self.get_repository_source_branch(repo)
-                _, flow = self.get_repository_strategy(repo)
-                source_index = flow.index(source_branch)
-                target_branch = flow[source_index + 1]
-                
-                # Validate commits one more time
+                target_branch = self.get_next_branch(repo, source_branch)
+                if target_branch is None:
+                    raise ValueError(f"No target branch after {source_branch} in flow for {repo}")
+            
+            # ใช้จำนวน commits จากการ validate ก่อนหน้า ตรวจกับ GitLab ใหม่เฉพาะเมื่อยังไม่เคย validate
+            commit_count = self._validated_commits.get((repo, source_branch, target_branch))
+            if commit_count is None:
                 has_commits, commit_count = self.gitlab.validate_commits(repo, source_branch, target_branch)
-                
-                mr_status = MRStatus(
-                    repo_name=repo,
-                    source_branch=source_branch,
-                    target_branch=target_branch,
-                    commit_count=commit_count
-                )
-                
-                if not has_commits:
-                    mr_status.state = "no_commits"
-                    mr_status.error = "No new commits to merge"
-                    phase_mrs.append(mr_status)
-                    continue
-                
-                # Create MR
-                mr_result = self.gitlab.create_merge_request(
-                    repo, source_branch, target_branch, f"{phase.value}_deployment",
-                    auto_merge=self.config['automation']['auto_merge']
-                )
-                
-                if mr_result:
-                    mr_status.mr_id = mr_result['id']
-                    mr_status.mr_url = mr_result['web_url']
-                    mr_status.state = "created"
-                    logger.info(f"Created MR for {repo}: {mr_result['web_url']}")
-                else:
-                    mr_status.state = "failed"
-                    mr_status.error = "Failed to create MR"
-                
-                phase_mrs.append(mr_status)
-                
-            except Exception as e:
-                logger.error(f"Failed to create MR for {repo}: {e}")
-                try:
-                    source_branch = self.get_repository_source_branch(repo)
-                    _, flow = self.get_repository_strategy(repo)
-                    source_index = flow.index(source_branch)
-                    target_branch = flow[source_index + 1]
-                except:
-                    source_branch = "unknown"
-                    target_branch = "unknown"
-                    
-                mr_status = MRStatus(
-                    repo_name=repo,
-                    source_branch=source_branch,
-                    target_branch=target_branch,
-                    state="failed",
-                    error=str(e)
-                )
-                phase_mrs.append(mr_status)
-        
-        return phase_mrs
+            else:
+                has_commits = commit_count > 0
+            
+            mr_status = MRStatus(
+                repo_name=repo,
+                source_branch=source_branch,
+                target_branch=target_branch,
+                commit_count=commit_count
+            )
+            
+            if not has_commits:
+                mr_status.state = "no_commits"
+                mr_status.error = "No new commits to merge"
+                return mr_status
+            
+            # Create MR
+            mr_result = self.gitlab.create_merge_request(
+                repo, source_branch, target_branch, f"{phase.value}_deployment",
+                auto_merge=self._auto_merge
+            )
+            
+            if mr_result:
+                mr_status.mr_id = mr_result['id']
+                mr_status.mr_url = mr_result['web_url']
+                mr_status.state = "created"
+                logger.info(f"Created MR for {repo}: {mr_result['web_url']}")
+            else:
+                mr_status.state = "failed"
+                mr_status.error = "Failed to create MR"
+            
+            return mr_status
+            
+        except Exception as e:
+            logger.error(f"Failed to create MR for {repo}: {e}")
+            return MRStatus(
+                repo_name=repo,
+                source_branch=source_branch,
+                target_branch=target_branch,
+                state="failed",
+                error=str(e)
+            )
     
-    def monitor_merge_requests(self, mr_statuses: List[MRStatus]) -> List[MRStatus]:
-        active_mrs = [mr for mr in mr_statuses if mr.state in ["created", "existing"] and mr.mr_id]
+    def monitor_merge_requests(self, mr_statuses: List[MRStatus], 
+                               on_update: Optional[Callable[[MRStatus], None]] = None) -> List[MRStatus]:
+        """
+        ติดตาม MR ที่ยัง active จนกว่าจะ merge/fail/timeout
+        
+        Args:
+            mr_statuses: รายการ MRStatus (จะถูกอัปเดต state ในตัว)
+            on_update: callback ที่ถูกเรียกทันทีที่ MR แต่ละรายการได้ผลลัพธ์ (เช่น อัปเดตตารางบนจอ)
+        
+        Returns:
+            mr_statuses เดิมที่อัปเดตแล้ว
+        """
+        active_mrs = [mr for mr in mr_statuses if mr.is_active and mr.mr_id]
         
         if not active_mrs:
             return mr_statuses
         
         logger.info(f"Monitoring {len(active_mrs)} active merge requests...")
         
-        # Monitor all MRs concurrently
-        completed_mrs = []
+        statuses_by_key = {}
         for mr_status in active_mrs:
-            try:
-                success, final_state = self.gitlab.monitor_merge_status(
-                    mr_status.repo_name, 
-                    mr_status.mr_id,
-                    timeout=self.config['automation']['pipeline_timeout']
-                )
-                
+            statuses_by_key.setdefault((mr_status.repo_name, mr_status.mr_id), []).append(mr_status)
+        
+        def apply_result(key: Tuple[str, int], result: Tuple[bool, str]):
+            success, final_state = result
+            for mr_status in statuses_by_key[key]:
                 if success:
                     mr_status.state = "merged"
                     logger.info(f"MR merged successfully for {mr_status.repo_name}")
@@ -228,13 +343,23 @@ class MRAutomation:
                     mr_status.error = f"Merge failed: {final_state}"
                     logger.error(f"MR failed for {mr_status.repo_name}: {final_state}")
                 
-                completed_mrs.append(mr_status)
-                
-            except Exception as e:
-                logger.error(f"Error monitoring MR for {mr_status.repo_name}: {e}")
-                mr_status.state = "failed"
-                mr_status.error = str(e)
-                completed_mrs.append(mr_status)
+                if on_update:
+                    on_update(mr_status)
+        
+        # Monitor all MRs concurrently in one shared polling loop
+        try:
+            self.gitlab.monitor_merge_statuses(
+                list(statuses_by_key),
+                timeout=self.config['automation']['pipeline_timeout'],
+                max_workers=self.config['automation'].get('max_workers', 8),
+                on_result=apply_result
+            )
+        except Exception as e:
+            logger.error(f"Error monitoring merge requests: {e}")
+            for mr_status in active_mrs:
+                if mr_status.is_active:
+                    mr_status.state = "failed"
+                    mr_status.error = str(e)
         
         return mr_statuses
     
@@ -249,23 +374,43 @@ class MRAutomation:
         
         logger.info(f"Waiting for deployment to {environment} environment...")
         
+        if not repos:
+            return True
+        
+        # รอ deployment ของทุก repo พร้อมกัน และรายงานผลทันทีที่แต่ละ repo เสร็จ
+        # ถ้าเปิด deployment_fail_fast จะหยุดรอ repo อื่นเมื่อมี repo ใดล้มเหลว
+        fail_fast = self.config['automation'].get('deployment_fail_fast', False)
+        cancel_event = threading.Event()
         all_deployed = True
-        for repo in repos:
-            try:
-                success = self.gitlab.wait_for_deployment(
-                    repo, environment,
-                    timeout=self.config['automation']['deployment_timeout']
-                )
-                
-                if not success:
-                    logger.error(f"Deployment failed for {repo} in {environment}")
-                    all_deployed = False
-                else:
-                    logger.info(f"Deployment successful for {repo} in {environment}")
+        
+        with ThreadPoolExecutor(max_workers=self.config['automation'].get('max_workers', 8)) as executor:
+            futures = {
+                executor.submit(
+                    self.gitlab.wait_for_deployment, repo, environment,
+                    timeout=self.config['automation']['deployment_timeout'],
+                    cancel_event=cancel_event
+                ): repo
+                for repo in repos
+            }
+            
+            for future in as_completed(futures):
+                repo = futures[future]
+                try:
+                    success = future.result()
                     
-            except Exception as e:
-                logger.error(f"Error waiting for deployment of {repo} in {environment}: {e}")
-                all_deployed = False
+                    if not success:
+                        logger.error(f"Deployment failed for {repo} in {environment}")
+                        all_deployed = False
+                    else:
+                        logger.info(f"Deployment successful for {repo} in {environment}")
+                        
+                except Exception as e:
+                    logger.error(f"Error waiting for deployment of {repo} in {environment}: {e}")
+                    all_deployed = False
+                
+                if not all_deployed and fail_fast and not cancel_event.is_set():
+                    logger.warning(f"Stopping remaining deployment waits for {environment} (deployment_fail_fast)")
+                    cancel_event.set()
         
         return all_deployed
     
@@ -287,7 +432,7 @@ class MRAutomation:
                     if has_commits:
                         mr_result = self.gitlab.create_merge_request(
                             repo, current_branch, next_branch, "next_phase",
-                            auto_merge=self.config['automation']['auto_merge']
+                            auto_merge=self._auto_merge
                         )
                         
                         mr_status = MRStatus(
@@ -314,31 +459,46 @@ class MRAutomation:
         return next_mrs
     
     def get_deployment_progress(self, mr_statuses: List[MRStatus], phase: DeploymentPhase) -> DeploymentProgress:
-        completed = [mr.repo_name for mr in mr_statuses if mr.state == "merged"]
-        failed = [mr.repo_name for mr in mr_statuses if mr.state == "failed"]
-        in_progress = [mr.repo_name for mr in mr_statuses if mr.state == "created"]
-        pending = [mr.repo_name for mr in mr_statuses if mr.state == "pending"]
+        repos_by_state = group_repos_by_state(mr_statuses)
         
         # Determine environment based on target branches
         environment = "unknown"
         if mr_statuses:
-            target_branch = mr_statuses[0].target_branch
-            for env_name, env_config in self.config['environments'].items():
-                if target_branch in env_config['triggered_by']:
-                    environment = env_name
-                    break
+            environment = self._branch_to_env.get(mr_statuses[0].target_branch, "unknown")
         
         return DeploymentProgress(
             phase=phase,
             environment=environment,
-            completed_repos=completed,
-            failed_repos=failed,
-            in_progress_repos=in_progress,
-            pending_repos=pending
+            completed_repos=repos_by_state["merged"],
+            failed_repos=repos_by_state["failed"],
+            in_progress_repos=repos_by_state["created"],
+            pending_repos=repos_by_state["pending"]
         )
     
+    def get_branch_fingerprints(self, repos: List[str]) -> Dict[str, str]:
+        """
+        สร้าง fingerprint จาก head SHA ของทุก branch ในแต่ละ repo
+        ถ้า fingerprint ไม่เปลี่ยน แปลว่าไม่มี branch ไหนถูก push/merge/สร้าง/ลบ ตั้งแต่ครั้งก่อน
+        
+        Args:
+            repos: รายการ repositories
+        
+        Returns:
+            Dictionary mapping repo_name to fingerprint (repo ที่ดึงข้อมูลไม่ได้จะไม่อยู่ในผลลัพธ์)
+        """
+        def fingerprint(repo: str) -> Optional[str]:
+            try:
+                heads = self.gitlab.get_branch_heads(repo)
+            except Exception as e:
+                logger.warning(f"Failed to get branch heads for {repo}: {e}")
+                return None
+            return hashlib.sha1(json.dumps(heads, sort_keys=True).encode()).hexdigest()
+        
+        return {repo: value for repo, value in zip(repos, self._run_per_repo(fingerprint, repos)) if value}
+    
     def find_branches_with_new_commits(self, repos: List[str], after_merge_branch: str, 
-                                     final_target_branch: str) -> Dict[str, List[Tuple[str, int]]]:
+                                     final_target_branch: str,
+                                     errors: Optional[Dict[str, str]] = None) -> Dict[str, List[Tuple[str, int]]]:
         """
         หาว่า branch ไหนมี new commits ระหว่าง merge และ final target branch สำหรับแต่ละ repo
         
@@ -346,23 +506,28 @@ class MRAutomation:
             repos: รายการ repositories ที่จะตรวจสอบ
             after_merge_branch: branch หลังจาก merge แล้ว (เช่น ss-dev, dev2)
             final_target_branch: final target branch (เช่น sit2)
+            errors: (optional) dict สำหรับเก็บ error ของ repo ที่ตรวจสอบไม่สำเร็จ (repo -> ข้อความ error)
         
         Returns:
             Dictionary mapping repo_name to list of (branch_name, commit_count)
         """
-        repo_branches = {}
-        
-        for repo in repos:
+        def find_repo_branches(repo: str) -> List[Tuple[str, int]]:
             try:
-                branches_with_commits = self.gitlab.get_branches_with_new_commits(
+                return self.gitlab.get_branches_with_new_commits(
                     repo, after_merge_branch, final_target_branch
                 )
-                if branches_with_commits:
-                    repo_branches[repo] = branches_with_commits
-                    logger.info(f"Found branches with new commits in {repo}: {len(branches_with_commits)}")
             except Exception as e:
                 logger.error(f"Failed to find branches with new commits for {repo}: {e}")
-                continue
+                if errors is not None:
+                    errors[repo] = str(e)
+                return []
+        
+        repo_branches = {}
+        
+        for repo, branches_with_commits in zip(repos, self._run_per_repo(find_repo_branches, repos)):
+            if branches_with_commits:
+                repo_branches[repo] = branches_with_commits
+                logger.info(f"Found branches with new commits in {repo}: {len(branches_with_commits)}")
         
         return repo_branches
     
@@ -384,30 +549,34 @@ class MRAutomation:
         for repo, branches in repo_branches.items():
             for branch_name, commit_count in branches:
                 try:
-                    # Get commit details for better MR description
-                    commit_details = self.gitlab.get_commit_details(repo, branch_name, final_target_branch)
-                    
-                    mr_status = MRStatus(
-                        repo_name=repo,
-                        source_branch=branch_name,
-                        target_branch=final_target_branch,
-                        commit_count=commit_count
-                    )
-                    
                     # Create MR with enhanced description
+                    # (commit details are fetched by the client only when a new MR is created)
                     mr_result = self.gitlab.create_merge_request_with_commits(
                         repo, branch_name, final_target_branch, mr_title,
-                        commit_details, auto_merge=self.config['automation']['auto_merge']
+                        auto_merge=self._auto_merge
                     )
                     
+                    # สร้าง MRStatus ครั้งเดียวด้วยผลลัพธ์ที่ได้ แทนการสร้างแล้วแก้ field ทีละตัว
                     if mr_result:
-                        mr_status.mr_id = mr_result['id']
-                        mr_status.mr_url = mr_result['web_url']
-                        mr_status.state = "created"
+                        mr_status = MRStatus(
+                            repo_name=repo,
+                            source_branch=branch_name,
+                            target_branch=final_target_branch,
+                            mr_id=mr_result['id'],
+                            mr_url=mr_result['web_url'],
+                            state="created",
+                            commit_count=commit_count
+                        )
                         logger.info(f"Created additional MR for {repo}: {branch_name} → {final_target_branch}")
                     else:
-                        mr_status.state = "failed"
-                        mr_status.error = "Failed to create additional MR"
+                        mr_status = MRStatus(
+                            repo_name=repo,
+                            source_branch=branch_name,
+                            target_branch=final_target_branch,
+                            state="failed",
+                            error="Failed to create additional MR",
+                            commit_count=commit_count
+                        )
                     
                     additional_mrs.append(mr_status)
                     
@@ -425,35 +594,39 @@ class MRAutomation:
         
         return additional_mrs
     
-    def find_intermediate_branch_commits(self, repos: List[str], final_target_branch: str) -> Dict[str, Dict[str, Tuple[int, List[Dict]]]]:
+    def find_intermediate_branch_commits(self, repos: List[str], final_target_branch: str,
+                                         errors: Optional[Dict[str, str]] = None) -> Dict[str, Dict[str, Tuple[int, List[Dict]]]]:
         """
         หา commits ใน intermediate branches ที่ไม่อยู่ใน final target branch
         
         Args:
             repos: รายการ repositories
             final_target_branch: final target branch
+            errors: (optional) dict สำหรับเก็บ error ของ repo ที่ตรวจสอบไม่สำเร็จ (repo -> ข้อความ error)
         
         Returns:
             Dictionary mapping repo_name to branch_commits
         """
-        repo_intermediate_commits = {}
-        
-        for repo in repos:
+        def find_repo_intermediate_commits(repo: str) -> Dict[str, Tuple[int, List[Dict]]]:
             try:
                 # Get branch flow for this repo
                 _, flow = self.get_repository_strategy(repo)
                 
                 # Find intermediate commits
-                intermediate_commits = self.gitlab.get_intermediate_branch_commits(repo, flow, final_target_branch)
-                
-                if intermediate_commits:
-                    repo_intermediate_commits[repo] = intermediate_commits
-                    total_commits = sum(count for count, _ in intermediate_commits.values())
-                    logger.info(f"Found {total_commits} intermediate commits in {repo} across {len(intermediate_commits)} branches")
-                
+                return self.gitlab.get_intermediate_branch_commits(repo, flow, final_target_branch)
             except Exception as e:
                 logger.error(f"Failed to find intermediate commits for {repo}: {e}")
-                continue
+                if errors is not None:
+                    errors[repo] = str(e)
+                return {}
+        
+        repo_intermediate_commits = {}
+        
+        for repo, intermediate_commits in zip(repos, self._run_per_repo(find_repo_intermediate_commits, repos)):
+            if intermediate_commits:
+                repo_intermediate_commits[repo] = intermediate_commits
+                total_commits = sum(count for count, _ in intermediate_commits.values())
+                logger.info(f"Found {total_commits} intermediate commits in {repo} across {len(intermediate_commits)} branches")
         
         return repo_intermediate_commits
     
@@ -470,27 +643,33 @@ class MRAutomation:
         Returns:
             List of MRStatus for created MRs
         """
+        self._commits_cache.clear()
+        self._repo_heads.clear()
         intermediate_mrs = []
+        pending_pairs_by_repo = self._prefetch_pending_pairs(repo_intermediate_commits)
         
         for repo, branch_commits in repo_intermediate_commits.items():
             try:
                 # Get repository flow to check dependencies
                 _, flow = self.get_repository_strategy(repo)
                 
+                # ผลตรวจ commits ค้างของแต่ละคู่ใน flow (index -> มี commits ค้างหรือไม่)
+                # ใช้ร่วมกันระหว่าง intermediate branches ของ repo เดียวกัน
+                pending_pairs = pending_pairs_by_repo.get(repo, {})
+                
                 for branch_name, (commit_count, commit_details) in branch_commits.items():
                     try:
                         # หา index ของ branch ปัจจุบันใน flow
-                        current_branch_index = -1
-                        try:
-                            current_branch_index = flow.index(branch_name)
-                        except ValueError:
+                        current_branch_index = self._branch_position(repo, branch_name)
+                        if current_branch_index < 0:
                             # ถ้า branch ไม่อยู่ใน main flow สามารถ merge ได้เลย
                             logger.debug(f"{repo}: {branch_name} not in main flow, allowing direct merge")
-                            current_branch_index = -1
                         
                         # ตรวจสอบ dependency ถ้า branch อยู่ใน main flow
                         if current_branch_index > 0:
-                            has_pending_commits = self._check_pending_previous_commits(repo, flow, current_branch_index)
+                            has_pending_commits = self._check_pending_previous_commits(
+                                repo, flow, current_branch_index, pending_pairs
+                            )
                             if has_pending_commits:
                                 logger.info(f"Skipping intermediate MR for {repo}: {branch_name} → {final_target_branch} due to pending previous commits")
                                 continue
@@ -505,7 +684,7 @@ class MRAutomation:
                         # Create enhanced MR for intermediate commits (or use existing)
                         mr_result = self.gitlab.create_merge_request_with_commits(
                             repo, branch_name, final_target_branch, mr_title,
-                            commit_details, auto_merge=self.config['automation']['auto_merge']
+                            commit_details, auto_merge=self._auto_merge
                         )
                         
                         if mr_result:
@@ -542,7 +721,7 @@ class MRAutomation:
         return intermediate_mrs
     
     def process_additional_commits(self, repos: List[str], current_target_branch: str, 
-                                 final_target_branch: str, mr_title: str = "additional") -> List[MRStatus]:
+                                 final_target_branch: str, mr_title: str = "additional") -> Tuple[List[MRStatus], Dict[str, str]]:
         """
         ประมวลผล additional commits จาก branches อื่นๆ และ intermediate branches ที่อาจมี commits ใหม่
         สำหรับทั้ง libraries และ services
@@ -554,13 +733,13 @@ class MRAutomation:
             mr_title: Title for the merge request
         
         Returns:
-            List of MRStatus for additional MRs created
+            Tuple of (List of MRStatus for additional MRs created, Dict of repo -> error สำหรับ repo ที่ scan ไม่สำเร็จ)
         """
         logger.info(f"Processing additional commits for {len(repos)} repositories")
         
         # Determine repository type for logging
-        libraries = [repo for repo in repos if repo in self.config['repositories']['libraries']]
-        services = [repo for repo in repos if repo in self.config['repositories']['services']]
+        libraries = [repo for repo in repos if repo in self._library_set]
+        services = [repo for repo in repos if repo in self._service_set]
         
         if libraries:
             logger.info(f"Processing intermediate commits for {len(libraries)} libraries: {', '.join(libraries)}")
@@ -568,9 +747,12 @@ class MRAutomation:
             logger.info(f"Processing intermediate commits for {len(services)} services: {', '.join(services)}")
         
         all_additional_mrs = []
+        scan_errors: Dict[str, str] = {}
         
         # 1. หา branches ที่มี new commits (original functionality) - ทำงานกับทั้ง libraries และ services
-        repo_branches = self.find_branches_with_new_commits(repos, current_target_branch, final_target_branch)
+        repo_branches = self.find_branches_with_new_commits(
+            repos, current_target_branch, final_target_branch, errors=scan_errors
+        )
         
         if repo_branches:
             total_branches = sum(len(branches) for branches in repo_branches.values())
@@ -580,7 +762,9 @@ class MRAutomation:
             all_additional_mrs.extend(additional_mrs)
         
         # 2. หา commits ใน intermediate branches (new functionality)
-        repo_intermediate_commits = self.find_intermediate_branch_commits(repos, final_target_branch)
+        repo_intermediate_commits = self.find_intermediate_branch_commits(
+            repos, final_target_branch, errors=scan_errors
+        )
         
         if repo_intermediate_commits:
             total_intermediate_commits = sum(
@@ -598,12 +782,15 @@ class MRAutomation:
             logger.info(f"Created {len(progressive_mrs)} progressive merge requests")
             all_additional_mrs.extend(progressive_mrs)
         
+        if scan_errors:
+            logger.warning(f"Additional commit scan failed for {len(scan_errors)} repositories: {', '.join(scan_errors)}")
+        
         if not all_additional_mrs:
             logger.info("No additional commits found in any branches")
-            return []
+            return [], scan_errors
         
         logger.info(f"Created {len(all_additional_mrs)} total additional merge requests")
-        return all_additional_mrs
+        return all_additional_mrs, scan_errors
     
     def create_progressive_merge_requests(self, repos: List[str], mr_title: str = "progressive") -> List[MRStatus]:
         """
@@ -618,193 +805,282 @@ class MRAutomation:
         Returns:
             List of MRStatus for progressive MRs created
         """
-        progressive_mrs = []
+        self._commits_cache.clear()
+        self._repo_heads.clear()
+        self._prefetch_open_mrs(repos)
+        
+        # แต่ละ repo ไม่ขึ้นต่อกัน จึงประมวลผลแบบขนาน (ผลลัพธ์เรียงตามลำดับ repos)
+        return [mr for repo_mrs in self._run_per_repo(
+            lambda repo: self._create_repo_progressive_mrs(repo, mr_title), repos
+        ) for mr in repo_mrs]
+    
+    def _create_repo_progressive_mrs(self, repo: str, mr_title: str) -> List[MRStatus]:
+        """สร้าง MR ต่อเนื่องของ repo เดียว (ดู create_progressive_merge_requests)"""
+        repo_mrs = []
         
-        for repo in repos:
-            try:
-                # หา strategy และ flow สำหรับ repo นี้
-                _, flow = self.get_repository_strategy(repo)
+        try:
+            # หา strategy และ flow สำหรับ repo นี้
+            _, flow = self.get_repository_strategy(repo)
+            
+            logger.debug(f"Checking progressive opportunities for {repo} with flow: {flow}")
+            
+            # ต้องมีอย่างน้อย 3 branch ถึงจะมี MR ต่อเนื่อง (target -> next) ได้
+            if len(flow) < 3:
+                return repo_mrs
+            
+            # head SHA ของทุก branch ด้วย list call เดียว ใช้ตรวจ merge ของทุกคู่ใน flow
+            heads = self._get_branch_heads(repo)
+            # MR ที่เปิดอยู่ของ repo ด้วย list call เดียว แทนการ query ทีละคู่ branch
+            open_pairs = self._get_open_mr_pairs(repo)
+            
+            # ตรวจสอบแต่ละ step ใน flow โดยไม่หยุดที่ ss-dev
+            for i in range(len(flow) - 1):
+                source_branch = flow[i]
+                target_branch = flow[i + 1]
+                
+                # ตรวจสอบว่า source branch ได้ merge เข้า target แล้วหรือไม่
+                if not self._is_branch_merged_to_target(repo, source_branch, target_branch, heads):
+                    continue
+                
+                # หา target branch มี next branch หรือไม่
+                if i + 1 >= len(flow) - 1:  # target เป็น branch สุดท้ายแล้ว
+                    continue
+                
+                next_branch = flow[i + 2]
                 
-                logger.debug(f"Checking progressive opportunities for {repo} with flow: {flow}")
+                # ตรวจสอบว่ามี commits ใหม่ใน target -> next
+                has_commits, commit_count = self._validate_commits(repo, target_branch, next_branch)
                 
-                # ตรวจสอบแต่ละ step ใน flow โดยไม่หยุดที่ ss-dev
-                for i in range(len(flow) - 1):
-                    source_branch = flow[i]
-                    target_branch = flow[i + 1]
+                if has_commits:
+                    logger.info(f"Found progressive opportunity: {repo} {target_branch} -> {next_branch} ({commit_count} commits)")
                     
-                    # ตรวจสอบว่า source branch ได้ merge เข้า target แล้วหรือไม่
-                    if not self._is_branch_merged_to_target(repo, source_branch, target_branch):
+                    # ตรวจสอบว่ามี MR อยู่แล้วหรือไม่
+                    existing_mrs = self._check_existing_mr(repo, target_branch, next_branch, open_pairs,
+                                                           heads.get(target_branch))
+                    if existing_mrs:
+                        logger.info(f"MR already exists for {repo}: {target_branch} -> {next_branch}")
                         continue
                     
-                    # หา target branch มี next branch หรือไม่
-                    if i + 1 >= len(flow) - 1:  # target เป็น branch สุดท้ายแล้ว
-                        continue
+                    # สร้าง MR ใหม่
+                    mr_result = self.gitlab.create_merge_request(
+                        repo, target_branch, next_branch, mr_title,
+                        auto_merge=self._auto_merge
+                    )
                     
-                    next_branch = flow[i + 2]
+                    mr_status = MRStatus(
+                        repo_name=repo,
+                        source_branch=target_branch,
+                        target_branch=next_branch,
+                        commit_count=commit_count
+                    )
+                    
+                    if mr_result:
+                        mr_status.mr_id = mr_result['id']
+                        mr_status.mr_url = mr_result['web_url']
+                        mr_status.state = "created"
+                        self._record_known_mr(repo, target_branch, next_branch, heads.get(target_branch))
+                        logger.info(f"✅ Created progressive MR for {repo}: {target_branch} -> {next_branch}")
+                    else:
+                        mr_status.state = "failed"
+                        mr_status.error = "Failed to create progressive MR"
+                        logger.error(f"❌ Failed to create progressive MR for {repo}: {target_branch} -> {next_branch}")
                     
-                    # ตรวจสอบว่ามี commits ใหม่ใน target -> next
-                    has_commits, commit_count = self.gitlab.validate_commits(repo, target_branch, next_branch)
+                    repo_mrs.append(mr_status)
+                    # ลบ break ออกเพื่อให้ทำต่อไปจนถึงปลาย branch
                     
-                    if has_commits:
-                        logger.info(f"Found progressive opportunity: {repo} {target_branch} -> {next_branch} ({commit_count} commits)")
-                        
-                        # ตรวจสอบว่ามี MR อยู่แล้วหรือไม่
-                        existing_mrs = self._check_existing_mr(repo, target_branch, next_branch)
-                        if existing_mrs:
-                            logger.info(f"MR already exists for {repo}: {target_branch} -> {next_branch}")
-                            continue
-                        
-                        # สร้าง MR ใหม่
-                        mr_result = self.gitlab.create_merge_request(
-                            repo, target_branch, next_branch, mr_title,
-                            auto_merge=self.config['automation']['auto_merge']
-                        )
-                        
-                        mr_status = MRStatus(
-                            repo_name=repo,
-                            source_branch=target_branch,
-                            target_branch=next_branch,
-                            commit_count=commit_count
-                        )
-                        
-                        if mr_result:
-                            mr_status.mr_id = mr_result['id']
-                            mr_status.mr_url = mr_result['web_url']
-                            mr_status.state = "created"
-                            logger.info(f"✅ Created progressive MR for {repo}: {target_branch} -> {next_branch}")
-                        else:
-                            mr_status.state = "failed"
-                            mr_status.error = "Failed to create progressive MR"
-                            logger.error(f"❌ Failed to create progressive MR for {repo}: {target_branch} -> {next_branch}")
-                        
-                        progressive_mrs.append(mr_status)
-                        # ลบ break ออกเพื่อให้ทำต่อไปจนถึงปลาย branch
-                        
-            except Exception as e:
-                logger.error(f"Error creating progressive MR for {repo}: {e}")
-                continue
+        except Exception as e:
+            logger.error(f"Error creating progressive MR for {repo}: {e}")
         
-        return progressive_mrs
+        return repo_mrs
     
-    def _should_stop_at_deploy_branch(self, target_branch: str) -> bool:
+    def create_complete_flow_merge_requests(self, repos: List[str], mr_title: str = "complete_flow") -> List[MRStatus]:
         """
-        ตรวจสอบว่า target branch นี้ trigger environment ที่มี wait_for_deployment = true หรือไม่
+        สร้าง MR ทั้งหมดตาม flow ที่กำหนดไว้ไปจนถึงปลาย branch โดยไม่หยุดที่ ss-dev
+        เหมาะสำหรับกรณีที่ต้องการสร้าง MR ทั้งหมดในครั้งเดียว
         
         Args:
-            target_branch: branch ที่จะ merge เข้า
+            repos: รายการ repositories ที่จะสร้าง MR
+            mr_title: Title for the merge request
         
         Returns:
-            True ถ้าต้องหยุดที่ branch นี้เนื่องจาก wait_for_deployment = true
+            List of MRStatus for all MRs created
         """
-        try:
-            for env_name, env_config in self.config.get('environments', {}).items():
-                triggered_by = env_config.get('triggered_by', [])
-                wait_for_deployment = env_config.get('wait_for_deployment', False)
-                
-                if target_branch in triggered_by and wait_for_deployment:
-                    logger.debug(f"Target branch {target_branch} triggers {env_name} with wait_for_deployment=true")
-                    return True
-            
-            return False
-        except Exception as e:
-            logger.debug(f"Error checking deploy branch stop condition for {target_branch}: {e}")
-            return False
+        self._commits_cache.clear()
+        self._repo_heads.clear()
+        self._prefetch_open_mrs(repos)
+        self._prefetch_flow_commits(repos)
+        
+        # แต่ละ repo ไม่ขึ้นต่อกัน จึงประมวลผลแบบขนาน (ผลลัพธ์เรียงตามลำดับ repos)
+        return [mr for repo_mrs in self._run_per_repo(
+            lambda repo: self._create_repo_complete_flow_mrs(repo, mr_title), repos
+        ) for mr in repo_mrs]
     
-    def create_complete_flow_merge_requests(self, repos: List[str], mr_title: str = "complete_flow") -> List[MRStatus]:
+    def _prefetch_pending_pairs(self, repo_intermediate_commits: Dict[str, Dict[str, Tuple[int, List[Dict]]]]
+                                ) -> Dict[str, Dict[int, bool]]:
         """
-        สร้าง MR ทั้งหมดตาม flow ที่กำหนดไว้ไปจนถึงปลาย branch โดยไม่หยุดที่ ss-dev
-        เหมาะสำหรับกรณีที่ต้องการสร้าง MR ทั้งหมดในครั้งเดียว
+        ตรวจ commits ค้างใน flow ของทุก repo พร้อมกันล่วงหน้า (ไม่ต้องรอ repo ก่อนหน้าทีละ repo)
+        ผลของแต่ละคู่เก็บใน pair cache ของ repo นั้น ให้การตรวจรายย่อยภายหลังอ่านจาก cache
         
         Args:
-            repos: รายการ repositories ที่จะสร้าง MR
-            mr_title: Title for the merge request
+            repo_intermediate_commits: Dictionary mapping repo to branch to (commit_count, commit_details)
         
         Returns:
-            List of MRStatus for all MRs created
+            Dictionary mapping repo to pair cache (index -> มี commits ค้างหรือไม่)
         """
-        complete_flow_mrs = []
+        deepest_index = {}
+        for repo, branch_commits in repo_intermediate_commits.items():
+            try:
+                positions = [self._branch_position(repo, branch_name) for branch_name in branch_commits]
+            except ValueError:
+                continue
+            if max(positions, default=-1) > 0:
+                deepest_index[repo] = max(positions)
+        
+        pending_pairs_by_repo: Dict[str, Dict[int, bool]] = {repo: {} for repo in deepest_index}
         
-        for repo in repos:
+        def check_repo(repo: str):
+            _, flow = self.get_repository_strategy(repo)
+            self._check_pending_previous_commits(repo, flow, deepest_index[repo], pending_pairs_by_repo[repo])
+        
+        self._run_per_repo(check_repo, list(deepest_index))
+        return pending_pairs_by_repo
+    
+    def _prefetch_flow_commits(self, repos: List[str]):
+        """
+        ตรวจ commits ของทุก step ใน flow ของทุก repo พร้อมกันล่วงหน้า แล้วเก็บไว้ใน _commits_cache
+        เพื่อให้ loop สร้าง MR ไม่ต้องรอ compare API ทีละ step
+        (ตรวจเฉพาะ step จนถึง deploy branch แรก เพราะ loop จะหยุดที่นั่น)
+        
+        Args:
+            repos: รายการ repositories ที่จะสร้าง MR
+        """
+        def fetch_heads(repo: str) -> Optional[Dict[str, str]]:
             try:
-                # หา strategy และ flow สำหรับ repo นี้
-                _, flow = self.get_repository_strategy(repo)
-                
-                logger.info(f"Creating complete flow MRs for {repo} with flow: {flow}")
+                return self._get_branch_heads(repo)
+            except Exception as e:
+                logger.debug(f"Error listing branches for {repo}: {e}")
+                return None
+        
+        queries = []
+        for repo, heads in zip(repos, self._run_per_repo(fetch_heads, repos)):
+            try:
+                strategy_name, _ = self.get_repository_strategy(repo)
+            except ValueError:
+                continue
+            
+            for source_branch, target_branch, should_stop_at_target in self._flow_steps[strategy_name]:
+                # คู่ที่ไม่มี branch หรือ head เดียวกัน loop ไม่ต้องใช้ผล compare จึงไม่ต้องตรวจ
+                if heads is None:
+                    needed = True
+                else:
+                    source_sha, target_sha = heads.get(source_branch), heads.get(target_branch)
+                    needed = source_sha is not None and target_sha is not None and source_sha != target_sha
+                if needed:
+                    queries.append((repo, source_branch, target_branch))
+                if should_stop_at_target:
+                    break
+        
+        self._commits_cache.update(self.gitlab.batch_validate_commits(
+            queries, max_workers=self.config['automation'].get('max_workers', 8)
+        ))
+    
+    def _create_repo_complete_flow_mrs(self, repo: str, mr_title: str) -> List[MRStatus]:
+        """สร้าง MR ตาม flow ของ repo เดียว (ดู create_complete_flow_merge_requests)"""
+        repo_mrs = []
+        
+        try:
+            # หา strategy และ flow สำหรับ repo นี้
+            strategy_name, flow = self.get_repository_strategy(repo)
+            
+            logger.info(f"Creating complete flow MRs for {repo} with flow: {flow}")
+            
+            # MR ที่เปิดอยู่ของ repo ด้วย list call เดียว แทนการ query ทีละคู่ branch
+            open_pairs = self._get_open_mr_pairs(repo)
+            
+            # head SHA ของทุก branch (ดึงไว้แล้วตอน prefetch) ใช้แทนการตรวจ branch ทีละตัว
+            heads = self._get_branch_heads(repo)
+        except Exception as e:
+            logger.error(f"Error creating complete flow MRs for {repo}: {e}")
+            return repo_mrs
+        
+        # สร้าง MR สำหรับทุก step ใน flow ที่มี commits
+        # should_stop_at_target: target branch นี้ trigger environment ที่มี wait_for_deployment = true หรือไม่
+        for source_branch, target_branch, should_stop_at_target in self._flow_steps[strategy_name]:
+            # ตรวจสอบว่า branches มีอยู่จริง
+            source_sha = heads.get(source_branch)
+            if source_sha is None:
+                logger.warning(f"Source branch {source_branch} does not exist in {repo}")
+                continue
+            
+            target_sha = heads.get(target_branch)
+            if target_sha is None:
+                logger.warning(f"Target branch {target_branch} does not exist in {repo}")
+                continue
+            
+            try:
+                # ตรวจสอบว่ามี commits ใหม่ (head เดียวกันแปลว่าไม่มี ไม่ต้องเรียก compare API)
+                if source_sha == target_sha:
+                    has_commits, commit_count = False, 0
+                else:
+                    has_commits, commit_count = self._validate_commits(repo, source_branch, target_branch)
                 
-                # สร้าง MR สำหรับทุก step ใน flow ที่มี commits
-                for i in range(len(flow) - 1):
-                    source_branch = flow[i]
-                    target_branch = flow[i + 1]
-                    
-                    # ตรวจสอบว่า target branch นี้ trigger environment ที่มี wait_for_deployment = true หรือไม่
-                    should_stop_at_target = self._should_stop_at_deploy_branch(target_branch)
-                    
-                    # ตรวจสอบว่า branches มีอยู่จริง
-                    if not self.gitlab.branch_exists(repo, source_branch):
-                        logger.warning(f"Source branch {source_branch} does not exist in {repo}")
-                        continue
-                    
-                    if not self.gitlab.branch_exists(repo, target_branch):
-                        logger.warning(f"Target branch {target_branch} does not exist in {repo}")
-                        continue
-                    
-                    # ตรวจสอบว่ามี commits ใหม่
-                    has_commits, commit_count = self.gitlab.validate_commits(repo, source_branch, target_branch)
-                    
-                    if has_commits:
-                        # ตรวจสอบว่ามี MR อยู่แล้วหรือไม่
-                        existing_mrs = self._check_existing_mr(repo, source_branch, target_branch)
-                        if existing_mrs:
-                            logger.info(f"MR already exists for {repo}: {source_branch} -> {target_branch}")
-                            # ถ้าต้องหยุดที่ target branch นี้ ให้ break ออกจาก loop
-                            if should_stop_at_target:
-                                logger.info(f"Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
-                                break
-                            continue
-                        
-                        # สร้าง MR ใหม่
-                        mr_result = self.gitlab.create_merge_request(
-                            repo, source_branch, target_branch, mr_title,
-                            auto_merge=self.config['automation']['auto_merge']
-                        )
-                        
-                        mr_status = MRStatus(
-                            repo_name=repo,
-                            source_branch=source_branch,
-                            target_branch=target_branch,
-                            commit_count=commit_count
-                        )
-                        
-                        if mr_result:
-                            mr_status.mr_id = mr_result['id']
-                            mr_status.mr_url = mr_result['web_url']
-                            mr_status.state = "created"
-                            logger.info(f"✅ Created complete flow MR for {repo}: {source_branch} -> {target_branch} ({commit_count} commits)")
-                        else:
-                            mr_status.state = "failed"
-                            mr_status.error = "Failed to create complete flow MR"
-                            logger.error(f"❌ Failed to create complete flow MR for {repo}: {source_branch} -> {target_branch}")
-                        
-                        complete_flow_mrs.append(mr_status)
-                        
+                if has_commits:
+                    # ตรวจสอบว่ามี MR อยู่แล้วหรือไม่
+                    existing_mrs = self._check_existing_mr(repo, source_branch, target_branch, open_pairs, source_sha)
+                    if existing_mrs:
+                        logger.info(f"MR already exists for {repo}: {source_branch} -> {target_branch}")
                         # ถ้าต้องหยุดที่ target branch นี้ ให้ break ออกจาก loop
                         if should_stop_at_target:
                             logger.info(f"Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
                             break
+                        continue
+                    
+                    # สร้าง MR ใหม่
+                    mr_result = self.gitlab.create_merge_request(
+                        repo, source_branch, target_branch, mr_title,
+                        auto_merge=self._auto_merge
+                    )
+                    
+                    mr_status = MRStatus(
+                        repo_name=repo,
+                        source_branch=source_branch,
+                        target_branch=target_branch,
+                        commit_count=commit_count
+                    )
+                    
+                    if mr_result:
+                        mr_status.mr_id = mr_result['id']
+                        mr_status.mr_url = mr_result['web_url']
+                        mr_status.state = "created"
+                        self._record_known_mr(repo, source_branch, target_branch, source_sha)
+                        logger.info(f"✅ Created complete flow MR for {repo}: {source_branch} -> {target_branch} ({commit_count} commits)")
                     else:
-                        logger.debug(f"No commits to merge for {repo}: {source_branch} -> {target_branch}")
-                        # แม้ไม่มี commits ก็ยังต้องตรวจสอบว่าต้องหยุดที่ target branch นี้หรือไม่
-                        if should_stop_at_target:
-                            logger.info(f"Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
-                            break
-                        
+                        mr_status.state = "failed"
+                        mr_status.error = "Failed to create complete flow MR"
+                        logger.error(f"❌ Failed to create complete flow MR for {repo}: {source_branch} -> {target_branch}")
+                    
+                    repo_mrs.append(mr_status)
+                    
+                    # ถ้าต้องหยุดที่ target branch นี้ ให้ break ออกจาก loop
+                    if should_stop_at_target:
+                        logger.info(f"Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
+                        break
+                else:
+                    logger.debug(f"No commits to merge for {repo}: {source_branch} -> {target_branch}")
+                    # แม้ไม่มี commits ก็ยังต้องตรวจสอบว่าต้องหยุดที่ target branch นี้หรือไม่
+                    if should_stop_at_target:
+                        logger.info(f"Stopping at deploy branch {target_branch} due to wait_for_deployment=true")
+                        break
             except Exception as e:
-                logger.error(f"Error creating complete flow MRs for {repo}: {e}")
-                continue
+                # error ของ step เดียวไม่ทำให้ step ที่เหลือของ repo ถูกข้ามไปด้วย
+                logger.error(f"Error creating complete flow MR for {repo}: {source_branch} -> {target_branch}: {e}")
+                if should_stop_at_target:
+                    break
         
-        return complete_flow_mrs
+        return repo_mrs
     
-    def _is_branch_merged_to_target(self, repo_name: str, source_branch: str, target_branch: str) -> bool:
+    def _is_branch_merged_to_target(self, repo_name: str, source_branch: str, target_branch: str,
+                                    heads: Optional[Dict[str, str]] = None) -> bool:
         """
         ตรวจสอบว่า source branch ได้ merge เข้า target branch แล้วหรือไม่
         (โดยดูจากว่าไม่มี commits ใหม่ใน source ที่ไม่อยู่ใน target)
@@ -813,35 +1089,106 @@ class MRAutomation:
             repo_name: ชื่อ repository
             source_branch: source branch
             target_branch: target branch
+            heads: (optional) branch -> head SHA ของ repo ที่ดึงไว้แล้ว
         
         Returns:
             True ถ้า source ได้ merge เข้า target แล้ว
         """
         try:
+            if heads is None:
+                heads = self.gitlab.get_branch_heads(repo_name)
+            
             # ตรวจสอบว่าทั้งสอง branch มีอยู่จริงหรือไม่
-            if not self.gitlab.branch_exists(repo_name, source_branch):
+            source_sha = heads.get(source_branch)
+            if source_sha is None:
                 logger.debug(f"Source branch {source_branch} does not exist in {repo_name}")
                 return False
             
-            if not self.gitlab.branch_exists(repo_name, target_branch):
+            target_sha = heads.get(target_branch)
+            if target_sha is None:
                 logger.debug(f"Target branch {target_branch} does not exist in {repo_name}")
                 return False
             
-            # ตรวจสอบ commits - ถ้าไม่มี commits ใหม่ แสดงว่า merge แล้ว
-            has_commits, commit_count = self.gitlab.validate_commits(repo_name, source_branch, target_branch)
+            # head เดียวกัน หรือคู่ SHA ที่เคยตรวจแล้ว ไม่ต้องเรียก compare API
+            if source_sha == target_sha:
+                logger.debug(f"{repo_name}: {source_branch} is fully merged to {target_branch}")
+                return True
             
-            if has_commits:
-                logger.debug(f"{repo_name}: {source_branch} has {commit_count} unmerged commits to {target_branch}")
-                return False
+            key = (repo_name, source_sha, target_sha)
+            if key in self._merged_cache:
+                return self._merged_cache[key]
+            
+            # ถ้าเคยนับได้ว่ามี commits ค้างใช้ผลเดิม ไม่งั้นตรวจด้วย merge_base ซึ่งถูกกว่า compare
+            # (ต้องการแค่ว่ามี commit ค้างหรือไม่ ไม่ต้องการจำนวน)
+            # ผล (False, 0) อาจมาจาก API error จึงไม่ใช้ตัดสินว่า merge แล้ว เพราะ _merged_cache อยู่ตลอดรอบการทำงาน
+            validated = self._commits_cache.get((repo_name, source_branch, target_branch))
+            if validated is not None and validated[0]:
+                merged = False
             else:
+                merged = self.gitlab.is_ancestor(repo_name, source_sha, target_sha)
+            self._merged_cache[key] = merged
+            
+            if merged:
                 logger.debug(f"{repo_name}: {source_branch} is fully merged to {target_branch}")
-                return True
+            else:
+                logger.debug(f"{repo_name}: {source_branch} has unmerged commits to {target_branch}")
+            return merged
                 
         except Exception as e:
             logger.debug(f"Error checking merge status for {repo_name} {source_branch} -> {target_branch}: {e}")
             return False
     
-    def _check_existing_mr(self, repo_name: str, source_branch: str, target_branch: str) -> bool:
+    def _prefetch_open_mrs(self, repos: List[str]):
+        """
+        ดึง MR ที่เปิดอยู่ของทั้ง group ครั้งเดียวแทนการ list ทีละ project
+        (repo เดียวใช้ list ของ project นั้นถูกกว่า จึงไม่ prefetch)
+        
+        Args:
+            repos: รายการ repositories ที่จะประมวลผล
+        """
+        self._open_mr_index = None
+        if len(repos) <= 1:
+            return
+        
+        try:
+            self._open_mr_index = self.gitlab.get_group_open_mr_pairs()
+        except Exception as e:
+            logger.debug(f"Error listing open MRs for group, falling back to per-project lists: {e}")
+    
+    def _get_open_mr_pairs(self, repo_name: str) -> Optional[Set[Tuple[str, str]]]:
+        """
+        ดึงคู่ (source, target) ของ MR ที่เปิดอยู่ทั้งหมดใน repo ด้วย list call เดียว
+        
+        Args:
+            repo_name: ชื่อ repository
+        
+        Returns:
+            Set ของ (source_branch, target_branch) หรือ None ถ้าดึงไม่สำเร็จ
+        """
+        try:
+            if self._open_mr_index is not None:
+                project = self.gitlab.get_project(repo_name)
+                open_pairs = self._open_mr_index.get(project.id, set())
+            else:
+                open_pairs = self.gitlab.get_open_mr_pairs(repo_name)
+        except Exception as e:
+            logger.debug(f"Error listing open MRs for {repo_name}: {e}")
+            return None
+        
+        # MR ที่จำไว้จากรอบก่อนแต่ไม่เปิดอยู่แล้ว (ถูก merge หรือปิดโดยไม่ merge) ต้องไม่นับว่ามีอยู่
+        for key in list(self._known_mrs):
+            if key[0] == repo_name and key[1:] not in open_pairs:
+                self._known_mrs.pop(key, None)
+        return open_pairs
+    
+    def _record_known_mr(self, repo_name: str, source_branch: str, target_branch: str,
+                         source_sha: Optional[str]):
+        if source_sha is not None:
+            self._known_mrs[(repo_name, source_branch, target_branch)] = source_sha
+    
+    def _check_existing_mr(self, repo_name: str, source_branch: str, target_branch: str,
+                           open_pairs: Optional[Set[Tuple[str, str]]] = None,
+                           source_sha: Optional[str] = None) -> bool:
         """
         ตรวจสอบว่ามี MR ที่เปิดอยู่สำหรับ branch pair นี้หรือไม่
         
@@ -849,10 +1196,21 @@ class MRAutomation:
             repo_name: ชื่อ repository
             source_branch: source branch
             target_branch: target branch
+            open_pairs: (optional) ผลจาก _get_open_mr_pairs ถ้ามีจะไม่เรียก API ซ้ำ
+            source_sha: (optional) head SHA ปัจจุบันของ source ใช้เทียบกับ MR ที่รอบนี้สร้างหรือพบไว้แล้ว
         
         Returns:
             True ถ้ามี MR อยู่แล้ว
         """
+        if source_sha is not None and self._known_mrs.get((repo_name, source_branch, target_branch)) == source_sha:
+            return True
+        
+        if open_pairs is not None:
+            exists = (source_branch, target_branch) in open_pairs
+            if exists:
+                self._record_known_mr(repo_name, source_branch, target_branch, source_sha)
+            return exists
+        
         try:
             project = self.gitlab.get_project(repo_name)
             
@@ -860,16 +1218,21 @@ class MRAutomation:
             existing_mrs = project.mergerequests.list(
                 source_branch=source_branch,
                 target_branch=target_branch,
-                state='opened'
+                state='opened',
+                per_page=1,
+                get_all=False
             )
             
-            return len(existing_mrs) > 0
+            if existing_mrs:
+                self._record_known_mr(repo_name, source_branch, target_branch, source_sha)
+            return bool(existing_mrs)
             
         except Exception as e:
             logger.debug(f"Error checking existing MR for {repo_name} {source_branch} -> {target_branch}: {e}")
             return False
     
-    def _check_pending_previous_commits(self, repo_name: str, flow: List[str], current_index: int) -> bool:
+    def _check_pending_previous_commits(self, repo_name: str, flow: List[str], current_index: int,
+                                        pair_cache: Optional[Dict[int, bool]] = None) -> bool:
         """
         ตรวจสอบว่ามี branches ก่อนหน้า current_index ที่ยังมี commits ค้างอยู่หรือไม่
         
@@ -877,29 +1240,95 @@ class MRAutomation:
             repo_name: ชื่อ repository
             flow: branch flow sequence
             current_index: index ปัจจุบันใน flow ที่ต้องการตรวจสอบ
+            pair_cache: (optional) ผลตรวจของคู่ flow[i] -> flow[i + 1] ที่เคยตรวจแล้ว (i -> มี commits ค้างหรือไม่)
         
         Returns:
             True ถ้ามี previous branches ที่มี commits ค้างอยู่
         """
+        # ไม่มีคู่ก่อนหน้าให้ตรวจ ไม่ต้องดึง branch heads
+        if current_index <= 0:
+            return False
+        
         try:
+            if pair_cache is None:
+                pair_cache = {}
+            
+            # head SHA ของทุก branch ด้วย list call เดียว แล้วเทียบกันเองแทนการเรียก compare ทีละคู่
+            heads = self._get_branch_heads(repo_name)
+            
+            # คู่ที่ต้องถาม GitLab (head ต่างกันและยังไม่เคยตรวจ) ไม่ขึ้นต่อกัน จึงตรวจพร้อมกันก่อน
+            # แล้วให้ loop ด้านล่างอ่านผลจาก _merged_cache
+            unresolved = []
+            for prev_i in range(current_index):
+                if prev_i in pair_cache:
+                    continue
+                source_sha = heads.get(flow[prev_i])
+                target_sha = heads.get(flow[prev_i + 1])
+                if (source_sha is not None and target_sha is not None and source_sha != target_sha
+                        and (repo_name, source_sha, target_sha) not in self._merged_cache):
+                    unresolved.append((source_sha, target_sha))
+            unresolved = list(dict.fromkeys(unresolved))
+            
+            if len(unresolved) > 1:
+                max_workers = min(len(unresolved), self.config['automation'].get('max_workers', 8))
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    results = executor.map(lambda shas: self.gitlab.is_ancestor(repo_name, *shas), unresolved)
+                    for (source_sha, target_sha), merged in zip(unresolved, results):
+                        self._merged_cache[(repo_name, source_sha, target_sha)] = merged
+            
             # ตรวจสอบ branches ทั้งหมดก่อนหน้า current_index
             for prev_i in range(current_index):
+                if prev_i in pair_cache:
+                    if pair_cache[prev_i]:
+                        return True
+                    continue
+                
                 prev_source = flow[prev_i]
                 prev_target = flow[prev_i + 1]
+                source_sha = heads.get(prev_source)
+                target_sha = heads.get(prev_target)
                 
-                # ตรวจสอบว่า branch มีอยู่จริงหรือไม่
-                if (not self.gitlab.branch_exists(repo_name, prev_source) or 
-                    not self.gitlab.branch_exists(repo_name, prev_target)):
-                    continue
+                # branch ที่ไม่มีอยู่จริง หรือ head เดียวกัน ไม่มี commits ค้าง
+                if source_sha is None or target_sha is None or source_sha == target_sha:
+                    has_commits = False
+                else:
+                    # source ยังไม่อยู่ในประวัติของ target = ยังมี commits ค้าง (ผลขึ้นกับ SHA จึงใช้ _merged_cache ร่วมได้)
+                    key = (repo_name, source_sha, target_sha)
+                    merged = self._merged_cache.get(key)
+                    if merged is None:
+                        merged = self._merged_cache[key] = self.gitlab.is_ancestor(repo_name, source_sha, target_sha)
+                    has_commits = not merged
                 
-                # ตรวจสอบว่ายังมี commits ค้างอยู่หรือไม่
-                has_commits, commit_count = self.gitlab.validate_commits(repo_name, prev_source, prev_target)
+                pair_cache[prev_i] = has_commits
                 if has_commits:
-                    logger.debug(f"{repo_name}: Found {commit_count} pending commits in {prev_source} -> {prev_target}")
+                    logger.debug(f"{repo_name}: Found pending commits in {prev_source} -> {prev_target}")
                     return True
             
             return False
             
         except Exception as e:
             logger.debug(f"Error checking pending commits for {repo_name}: {e}")
-            return False  # ในกรณี error ให้ดำเนินการต่อได้
\ No newline at end of file
+            return False  # ในกรณี error ให้ดำเนินการต่อได้
+    
+    def pending_predecessors(self, repo_name: str, flow: List[str]) -> List[bool]:
+        """
+        ตรวจ commits ค้างของทุก index ใน flow ด้วยการเดินไปข้างหน้าครั้งเดียว
+        แต่ละคู่ flow[i] -> flow[i + 1] ถูกตรวจไม่เกินหนึ่งครั้ง และไม่ต้องตรวจคู่หลังจากคู่แรกที่ค้าง
+        
+        Args:
+            repo_name: ชื่อ repository
+            flow: branch flow sequence
+        
+        Returns:
+            List หนึ่งค่าต่อ index ใน flow: True ถ้ามีคู่ก่อนหน้าที่ยังมี commits ค้าง (ผลเดียวกับ _check_pending_previous_commits)
+        """
+        pair_cache: Dict[int, bool] = {}
+        self._check_pending_previous_commits(repo_name, flow, len(flow) - 1, pair_cache)
+        
+        pending = [False] * len(flow)
+        for k in range(len(flow) - 1):
+            if pair_cache.get(k, False):
+                # คู่ k ค้าง ทุก index หลัง k จึงค้างตามไปด้วย
+                pending[k + 1:] = [True] * (len(flow) - k - 1)
+                break
+        return pending
\ No newline at end of file
@@ -1,13 +1,50 @@
 import logging
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set, Tuple, TypeVar
 
 from gitlab_client import GitLabClient
-from models import DeploymentPhase, MRStatus, DeploymentProgress
+from models import DeploymentPhase, MRStatus, DeploymentProgress, group_repos_by_state
 from config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def _run_concurrently(func: Callable[[T], R], items: List[T], max_workers: int) -> List[R]:
+    """Apply func to every item on a thread pool (the work is GitLab I/O), keeping input order."""
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
+def _mr_status_from_result(repo_name: str, source_branch: str, target_branch: str, commit_count: int,
+                           mr_result: Optional[Dict], failure_message: str) -> MRStatus:
+    """Build the MRStatus for a create call in one construction (MRStatus is a slots dataclass)."""
+    if mr_result:
+        return MRStatus(
+            repo_name=repo_name,
+            source_branch=source_branch,
+            target_branch=target_branch,
+            mr_id=mr_result['id'],
+            mr_url=mr_result['web_url'],
+            state="created",
+            commit_count=commit_count
+        )
+    return MRStatus(
+        repo_name=repo_name,
+        source_branch=source_branch,
+        target_branch=target_branch,
+        state="failed",
+        error=failure_message,
+        commit_count=commit_count
+    )
+
 
 class MRValidationService:
     """Service for validating repositories and branches."""
@@ -15,6 +52,8 @@ class MRValidationService:
     def __init__(self, gitlab_client: GitLabClient, config_manager: ConfigManager):
         self.gitlab = gitlab_client
         self.config = config_manager
+        # Snapshot of the automation settings; read on every MR instead of going through the manager
+        self._automation_config = config_manager.get_automation_config()
     
     def validate_repository(self, repo_name: str, source_branch: str) -> Tuple[bool, Optional[str], int]:
         """Validate a single repository for deployment readiness."""
@@ -25,14 +64,13 @@ class MRValidationService:
             
             # Get target branch
             flow = self.config.get_repository_flow(repo_name)
-            try:
-                source_index = flow.index(source_branch)
-                if source_index >= len(flow) - 1:
-                    return False, f"Source branch {source_branch} is already the final branch", 0
-                
-                target_branch = flow[source_index + 1]
-            except ValueError:
+            source_index = self.config.get_flow_index(repo_name).get(source_branch)
+            if source_index is None:
                 return False, f"Source branch {source_branch} not found in flow", 0
+            if source_index >= len(flow) - 1:
+                return False, f"Source branch {source_branch} is already the final branch", 0
+            
+            target_branch = flow[source_index + 1]
             
             # Check if target branch exists
             if not self.gitlab.branch_exists(repo_name, target_branch):
@@ -53,9 +91,13 @@ class MRValidationService:
         """Validate multiple repositories and return only valid ones."""
         valid_repos = []
         
-        for repo in repos:
-            is_valid, error, commit_count = self.validate_repository(repo, source_branch)
-            
+        # Each repository is validated independently; results come back in input order for logging
+        results = _run_concurrently(
+            lambda repo: self.validate_repository(repo, source_branch), repos,
+            self._automation_config.get('max_workers', 8)
+        )
+        
+        for repo, (is_valid, error, commit_count) in zip(repos, results):
             if is_valid:
                 valid_repos.append(repo)
                 logger.info(f"Repository {repo} is valid for deployment ({commit_count} commits)")
@@ -71,46 +113,47 @@ class MRCreationService:
     def __init__(self, gitlab_client: GitLabClient, config_manager: ConfigManager):
         self.gitlab = gitlab_client
         self.config = config_manager
+        self._automation_config = config_manager.get_automation_config()
     
     def create_single_mr(self, repo_name: str, source_branch: str, sprint_name: str) -> MRStatus:
         """Create a single merge request."""
         try:
             flow = self.config.get_repository_flow(repo_name)
-            source_index = flow.index(source_branch)
+            source_index = self.config.get_flow_index(repo_name).get(source_branch)
+            if source_index is None or source_index >= len(flow) - 1:
+                return MRStatus(
+                    repo_name=repo_name,
+                    source_branch=source_branch,
+                    target_branch="",
+                    state="failed",
+                    error=f"Source branch {source_branch} has no next branch in flow"
+                )
             target_branch = flow[source_index + 1]
             
             # Validate commits
             has_commits, commit_count = self.gitlab.validate_commits(repo_name, source_branch, target_branch)
             
-            mr_status = MRStatus(
-                repo_name=repo_name,
-                source_branch=source_branch,
-                target_branch=target_branch,
-                commit_count=commit_count
-            )
-            
             if not has_commits:
-                mr_status.state = "no_commits"
-                mr_status.error = "No new commits to merge"
-                return mr_status
+                return MRStatus(
+                    repo_name=repo_name,
+                    source_branch=source_branch,
+                    target_branch=target_branch,
+                    state="no_commits",
+                    error="No new commits to merge",
+                    commit_count=commit_count
+                )
             
             # Create MR
-            automation_config = self.config.get_automation_config()
             mr_result = self.gitlab.create_merge_request(
                 repo_name, source_branch, target_branch, sprint_name,
-                auto_merge=automation_config['auto_merge']
+                auto_merge=self._automation_config['auto_merge']
             )
             
             if mr_result:
-                mr_status.mr_id = mr_result['id']
-                mr_status.mr_url = mr_result['web_url']
-                mr_status.state = "created"
                 logger.info(f"Created MR for {repo_name}: {mr_result['web_url']}")
-            else:
-                mr_status.state = "failed"
-                mr_status.error = "Failed to create MR"
             
-            return mr_status
+            return _mr_status_from_result(repo_name, source_branch, target_branch, commit_count,
+                                          mr_result, "Failed to create MR")
             
         except Exception as e:
             logger.error(f"Failed to create MR for {repo_name}: {e}")
@@ -125,11 +168,10 @@ class MRCreationService:
     def create_mrs_for_repositories(self, repos: List[str], source_branch: str, 
                                   sprint_name: str) -> List[MRStatus]:
         """Create merge requests for multiple repositories."""
-        mrs = []
-        for repo in repos:
-            mr_status = self.create_single_mr(repo, source_branch, sprint_name)
-            mrs.append(mr_status)
-        return mrs
+        return _run_concurrently(
+            lambda repo: self.create_single_mr(repo, source_branch, sprint_name), repos,
+            self._automation_config.get('max_workers', 8)
+        )
 
 
 class MRMonitoringService:
@@ -138,18 +180,18 @@ class MRMonitoringService:
     def __init__(self, gitlab_client: GitLabClient, config_manager: ConfigManager):
         self.gitlab = gitlab_client
         self.config = config_manager
+        self._automation_config = config_manager.get_automation_config()
     
     def monitor_single_mr(self, mr_status: MRStatus) -> MRStatus:
         """Monitor a single merge request."""
-        if mr_status.state not in ["created", "existing"] or not mr_status.mr_id:
+        if not mr_status.is_active or not mr_status.mr_id:
             return mr_status
         
         try:
-            automation_config = self.config.get_automation_config()
             success, final_state = self.gitlab.monitor_merge_status(
                 mr_status.repo_name, 
                 mr_status.mr_id,
-                timeout=automation_config['pipeline_timeout']
+                timeout=self._automation_config['pipeline_timeout']
             )
             
             if success:
@@ -169,15 +211,49 @@ class MRMonitoringService:
     
     def monitor_multiple_mrs(self, mr_statuses: List[MRStatus]) -> List[MRStatus]:
         """Monitor multiple merge requests."""
-        active_mrs = [mr for mr in mr_statuses if mr.state in ["created", "existing"] and mr.mr_id]
+        active_mrs = [mr for mr in mr_statuses if mr.is_active and mr.mr_id]
         
         if not active_mrs:
             return mr_statuses
         
         logger.info(f"Monitoring {len(active_mrs)} active merge requests...")
         
+        if len(active_mrs) == 1:
+            self.monitor_single_mr(active_mrs[0])
+            return mr_statuses
+        
+        # Watch every pipeline at once in one shared polling loop, so the total wait is the
+        # slowest MR rather than the sum of all of them
+        # The same MR can be reported by more than one scan, so every status for a key is updated
+        statuses_by_key: Dict[Tuple[str, int], List[MRStatus]] = {}
         for mr_status in active_mrs:
-            self.monitor_single_mr(mr_status)
+            statuses_by_key.setdefault((mr_status.repo_name, mr_status.mr_id), []).append(mr_status)
+        
+        def record_result(key: Tuple[str, int], result: Tuple[bool, str]):
+            # Called as each MR settles, so progress is logged as it happens rather than at the end
+            success, final_state = result
+            for mr_status in statuses_by_key[key]:
+                if success:
+                    mr_status.state = "merged"
+                    logger.info(f"MR merged successfully for {mr_status.repo_name}")
+                else:
+                    mr_status.state = "failed"
+                    mr_status.error = f"Merge failed: {final_state}"
+                    logger.error(f"MR failed for {mr_status.repo_name}: {final_state}")
+        
+        try:
+            self.gitlab.monitor_merge_statuses(
+                list(statuses_by_key),
+                timeout=self._automation_config['pipeline_timeout'],
+                max_workers=self._automation_config.get('max_workers', 8),
+                on_result=record_result
+            )
+        except Exception as e:
+            logger.error(f"Error monitoring merge requests: {e}")
+            for mr_status in active_mrs:
+                if mr_status.is_active:
+                    mr_status.state = "failed"
+                    mr_status.error = str(e)
         
         return mr_statuses
 
@@ -188,6 +264,7 @@ class DeploymentService:
     def __init__(self, gitlab_client: GitLabClient, config_manager: ConfigManager):
         self.gitlab = gitlab_client
         self.config = config_manager
+        self._automation_config = config_manager.get_automation_config()
     
     def wait_for_environment_deployment(self, repos: List[str], environment: str) -> bool:
         """Wait for deployment to complete in specified environment."""
@@ -202,25 +279,43 @@ class DeploymentService:
         
         logger.info(f"Waiting for deployment to {environment} environment...")
         
+        if not repos:
+            return True
+        
+        # Deployments roll out in parallel, so wait for all of them at once and report each as it
+        # finishes; with deployment_fail_fast the remaining waits stop after the first failure
+        fail_fast = self._automation_config.get('deployment_fail_fast', False)
+        cancel_event = threading.Event()
         all_deployed = True
-        automation_config = self.config.get_automation_config()
         
-        for repo in repos:
-            try:
-                success = self.gitlab.wait_for_deployment(
-                    repo, environment,
-                    timeout=automation_config['deployment_timeout']
-                )
-                
-                if not success:
-                    logger.error(f"Deployment failed for {repo} in {environment}")
-                    all_deployed = False
-                else:
-                    logger.info(f"Deployment successful for {repo} in {environment}")
+        with ThreadPoolExecutor(max_workers=self._automation_config.get('max_workers', 8)) as executor:
+            futures = {
+                executor.submit(
+                    self.gitlab.wait_for_deployment, repo, environment,
+                    timeout=self._automation_config['deployment_timeout'],
+                    cancel_event=cancel_event
+                ): repo
+                for repo in repos
+            }
+            
+            for future in as_completed(futures):
+                repo = futures[future]
+                try:
+                    success = future.result()
                     
-            except Exception as e:
-                logger.error(f"Error waiting for deployment of {repo} in {environment}: {e}")
-                all_deployed = False
+                    if not success:
+                        logger.error(f"Deployment failed for {repo} in {environment}")
+                        all_deployed = False
+                    else:
+                        logger.info(f"Deployment successful for {repo} in {environment}")
+                        
+                except Exception as e:
+                    logger.error(f"Error waiting for deployment of {repo} in {environment}: {e}")
+                    all_deployed = False
+                
+                if not all_deployed and fail_fast and not cancel_event.is_set():
+                    logger.warning(f"Stopping remaining deployment waits for {environment} (deployment_fail_fast)")
+                    cancel_event.set()
         
         return all_deployed
 
@@ -232,8 +327,18 @@ class MRAutomation:
         self.gitlab = gitlab_client
         self.discord = discord_notifier
         self.config = config_manager
+        self._automation_config = config_manager.get_automation_config()
         self.mr_statuses: List[MRStatus] = []
         
+        # Run-wide memo of compare results repeated for every flow pair; entries of a repository
+        # are dropped once one of its MRs merges, since that moves the target branch
+        self._commits_cache: Dict[Tuple[str, str, str], Tuple[bool, int]] = {}
+        # Pairs a compare actually found fully merged; kept apart because validate_commits
+        # also reports a missing branch or failed compare as (False, 0)
+        self._merged_pairs: Set[Tuple[str, str, str]] = set()
+        # Open (source, target) MR pairs per repository, listed once per progressive run
+        self._open_mr_pairs: Dict[str, Set[Tuple[str, str]]] = {}
+        
         # Initialize services
         self.validation_service = MRValidationService(gitlab_client, config_manager)
         self.creation_service = MRCreationService(gitlab_client, config_manager)
@@ -268,7 +373,25 @@ class MRAutomation:
     
     def monitor_merge_requests(self, mr_statuses: List[MRStatus]) -> List[MRStatus]:
         """Monitor merge requests using monitoring service."""
-        return self.monitoring_service.monitor_multiple_mrs(mr_statuses)
+        self.monitoring_service.monitor_multiple_mrs(mr_statuses)
+        
+        for repo in {mr.repo_name for mr in mr_statuses if mr.state == "merged"}:
+            self._invalidate_commits_cache(repo)
+        
+        return mr_statuses
+    
+    def _invalidate_commits_cache(self, repo_name: str):
+        """Forget cached compare results of a repository after one of its MRs merged."""
+        for key in [key for key in self._commits_cache if key[0] == repo_name]:
+            del self._commits_cache[key]
+        self._merged_pairs = {key for key in self._merged_pairs if key[0] != repo_name}
+    
+    def _validate_commits(self, repo_name: str, source_branch: str, target_branch: str) -> Tuple[bool, int]:
+        key = (repo_name, source_branch, target_branch)
+        result = self._commits_cache.get(key)
+        if result is None:
+            result = self._commits_cache[key] = self.gitlab.validate_commits(repo_name, source_branch, target_branch)
+        return result
     
     def wait_for_environment_deployment(self, repos: List[str], environment: str) -> bool:
         """Wait for environment deployment using deployment service."""
@@ -276,228 +399,240 @@ class MRAutomation:
     
     def get_deployment_progress(self, mr_statuses: List[MRStatus], phase: DeploymentPhase) -> DeploymentProgress:
         """Get current deployment progress."""
-        completed = [mr.repo_name for mr in mr_statuses if mr.state == "merged"]
-        failed = [mr.repo_name for mr in mr_statuses if mr.state == "failed"]
-        in_progress = [mr.repo_name for mr in mr_statuses if mr.state == "created"]
-        pending = [mr.repo_name for mr in mr_statuses if mr.state == "pending"]
+        repos_by_state = group_repos_by_state(mr_statuses)
         
         # Determine environment based on target branches
         environment = "unknown"
         if mr_statuses:
-            target_branch = mr_statuses[0].target_branch
-            config_dict = self.config.load_config()
-            for env_name, env_config in config_dict['environments'].items():
-                if target_branch in env_config['triggered_by']:
-                    environment = env_name
-                    break
+            environment = self.config.get_environment_for_branch(mr_statuses[0].target_branch) or "unknown"
         
         return DeploymentProgress(
             phase=phase,
             environment=environment,
-            completed_repos=completed,
-            failed_repos=failed,
-            in_progress_repos=in_progress,
-            pending_repos=pending
+            completed_repos=repos_by_state["merged"],
+            failed_repos=repos_by_state["failed"],
+            in_progress_repos=repos_by_state["created"],
+            pending_repos=repos_by_state["pending"]
         )
     
     def create_next_phase_mrs(self, successful_repos: List[str], sprint_name: str) -> List[MRStatus]:
         """Create merge requests for the next phase."""
-        next_mrs = []
-        
-        for repo in successful_repos:
-            try:
-                flow = self.config.get_repository_flow(repo)
+        results = _run_concurrently(
+            lambda repo: self._create_next_phase_for_repo(repo, sprint_name),
+            successful_repos,
+            self._automation_config.get('max_workers', 8)
+        )
+        return [mr_status for mr_status in results if mr_status is not None]
+    
+    def _create_next_phase_for_repo(self, repo: str, sprint_name: str) -> Optional[MRStatus]:
+        """Create the next-phase MR of one repository, if any step has new commits."""
+        try:
+            flow = self.config.get_repository_flow(repo)
+            
+            # Find current position and create MR for next step
+            for i in range(len(flow) - 2):  # Skip last branch (no next step)
+                current_branch = flow[i + 1]  # Target from previous step becomes source
+                next_branch = flow[i + 2]
                 
-                # Find current position and create MR for next step
-                for i in range(len(flow) - 2):  # Skip last branch (no next step)
-                    current_branch = flow[i + 1]  # Target from previous step becomes source
-                    next_branch = flow[i + 2]
-                    
-                    # Check if we need to create this MR
-                    has_commits, commit_count = self.gitlab.validate_commits(repo, current_branch, next_branch)
+                # Check if we need to create this MR
+                has_commits, commit_count = self._validate_commits(repo, current_branch, next_branch)
+                
+                if has_commits:
+                    mr_result = self.gitlab.create_merge_request(
+                        repo, current_branch, next_branch, sprint_name,
+                        auto_merge=self._automation_config['auto_merge']
+                    )
                     
-                    if has_commits:
-                        automation_config = self.config.get_automation_config()
-                        mr_result = self.gitlab.create_merge_request(
-                            repo, current_branch, next_branch, sprint_name,
-                            auto_merge=automation_config['auto_merge']
-                        )
-                        
-                        mr_status = MRStatus(
-                            repo_name=repo,
-                            source_branch=current_branch,
-                            target_branch=next_branch,
-                            commit_count=commit_count
-                        )
-                        
-                        if mr_result:
-                            mr_status.mr_id = mr_result['id']
-                            mr_status.mr_url = mr_result['web_url']
-                            mr_status.state = "created"
-                        else:
-                            mr_status.state = "failed"
-                            mr_status.error = "Failed to create next phase MR"
-                        
-                        next_mrs.append(mr_status)
-                        break  # Only create one MR at a time per repo
-            
-            except Exception as e:
-                logger.error(f"Failed to create next phase MR for {repo}: {e}")
+                    # Only create one MR at a time per repo
+                    return _mr_status_from_result(repo, current_branch, next_branch, commit_count,
+                                                  mr_result, "Failed to create next phase MR")
+        
+        except Exception as e:
+            logger.error(f"Failed to create next phase MR for {repo}: {e}")
         
-        return next_mrs
+        return None
     
     def find_branches_with_new_commits(self, repos: List[str], after_merge_branch: str, 
                                      final_target_branch: str) -> Dict[str, List[Tuple[str, int]]]:
         """Find branches with new commits between merge and final target branch."""
-        repo_branches = {}
-        
-        for repo in repos:
-            try:
-                branches_with_commits = self.gitlab.get_branches_with_new_commits(
-                    repo, after_merge_branch, final_target_branch
-                )
-                if branches_with_commits:
-                    repo_branches[repo] = branches_with_commits
-                    logger.info(f"Found branches with new commits in {repo}: {len(branches_with_commits)}")
-            except Exception as e:
-                logger.error(f"Failed to find branches with new commits for {repo}: {e}")
-                continue
+        results = _run_concurrently(
+            lambda repo: self._find_repo_branches(repo, after_merge_branch, final_target_branch),
+            repos,
+            self._automation_config.get('max_workers', 8)
+        )
+        return {repo: branches for repo, branches in zip(repos, results) if branches}
+    
+    def _find_repo_branches(self, repo: str, after_merge_branch: str,
+                            final_target_branch: str) -> List[Tuple[str, int]]:
+        try:
+            branches_with_commits = self.gitlab.get_branches_with_new_commits(repo, after_merge_branch, final_target_branch)
+        except Exception as e:
+            logger.error(f"Failed to find branches with new commits for {repo}: {e}")
+            return []
         
-        return repo_branches
+        if branches_with_commits:
+            logger.info(f"Found branches with new commits in {repo}: {len(branches_with_commits)}")
+        return branches_with_commits
     
     def create_additional_merge_requests(self, repo_branches: Dict[str, List[Tuple[str, int]]], 
                                        final_target_branch: str, sprint_name: str) -> List[MRStatus]:
         """Create MRs for branches with new commits to final target branch."""
-        additional_mrs = []
-        
-        for repo, branches in repo_branches.items():
-            for branch_name, commit_count in branches:
-                try:
-                    commit_details = self.gitlab.get_commit_details(repo, branch_name, final_target_branch)
-                    
-                    mr_status = MRStatus(
-                        repo_name=repo,
-                        source_branch=branch_name,
-                        target_branch=final_target_branch,
-                        commit_count=commit_count
-                    )
-                    
-                    automation_config = self.config.get_automation_config()
-                    mr_result = self.gitlab.create_merge_request_with_commits(
-                        repo, branch_name, final_target_branch, sprint_name,
-                        commit_details, auto_merge=automation_config['auto_merge']
-                    )
-                    
-                    if mr_result:
-                        mr_status.mr_id = mr_result['id']
-                        mr_status.mr_url = mr_result['web_url']
-                        mr_status.state = "created"
-                        logger.info(f"Created additional MR for {repo}: {branch_name} → {final_target_branch}")
-                    else:
-                        mr_status.state = "failed"
-                        mr_status.error = "Failed to create additional MR"
-                    
-                    additional_mrs.append(mr_status)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to create additional MR for {repo}:{branch_name}: {e}")
-                    mr_status = MRStatus(
-                        repo_name=repo,
-                        source_branch=branch_name,
-                        target_branch=final_target_branch,
-                        state="failed",
-                        error=str(e),
-                        commit_count=commit_count
-                    )
-                    additional_mrs.append(mr_status)
-        
-        return additional_mrs
+        # Every (repo, branch) MR is independent, so all of them share one pool
+        tasks = [(repo, branch_name, commit_count)
+                 for repo, branches in repo_branches.items()
+                 for branch_name, commit_count in branches]
+        return _run_concurrently(
+            lambda task: self._create_additional_mr(*task, final_target_branch, sprint_name),
+            tasks,
+            self._automation_config.get('max_workers', 8)
+        )
+    
+    def _create_additional_mr(self, repo: str, branch_name: str, commit_count: int,
+                              final_target_branch: str, sprint_name: str) -> MRStatus:
+        """Create one additional MR; failures come back as a failed MRStatus."""
+        try:
+            commit_details = self.gitlab.get_commit_details(repo, branch_name, final_target_branch)
+            
+            mr_result = self.gitlab.create_merge_request_with_commits(
+                repo, branch_name, final_target_branch, sprint_name,
+                commit_details, auto_merge=self._automation_config['auto_merge']
+            )
+            
+            if mr_result:
+                logger.info(f"Created additional MR for {repo}: {branch_name} → {final_target_branch}")
+            
+            return _mr_status_from_result(repo, branch_name, final_target_branch, commit_count,
+                                          mr_result, "Failed to create additional MR")
+            
+        except Exception as e:
+            logger.error(f"Failed to create additional MR for {repo}:{branch_name}: {e}")
+            return MRStatus(
+                repo_name=repo,
+                source_branch=branch_name,
+                target_branch=final_target_branch,
+                state="failed",
+                error=str(e),
+                commit_count=commit_count
+            )
     
     def find_intermediate_branch_commits(self, repos: List[str], final_target_branch: str) -> Dict[str, Dict[str, Tuple[int, List[Dict]]]]:
         """Find commits in intermediate branches not in final target branch."""
-        repo_intermediate_commits = {}
-        
-        for repo in repos:
-            try:
-                flow = self.config.get_repository_flow(repo)
-                intermediate_commits = self.gitlab.get_intermediate_branch_commits(repo, flow, final_target_branch)
-                
-                if intermediate_commits:
-                    repo_intermediate_commits[repo] = intermediate_commits
-                    total_commits = sum(count for count, _ in intermediate_commits.values())
-                    logger.info(f"Found {total_commits} intermediate commits in {repo} across {len(intermediate_commits)} branches")
-                
-            except Exception as e:
-                logger.error(f"Failed to find intermediate commits for {repo}: {e}")
-                continue
+        results = _run_concurrently(
+            lambda repo: self._find_repo_intermediate_commits(repo, final_target_branch),
+            repos,
+            self._automation_config.get('max_workers', 8)
+        )
+        return {repo: commits for repo, commits in zip(repos, results) if commits}
+    
+    def _find_repo_intermediate_commits(self, repo: str, final_target_branch: str) -> Dict[str, Tuple[int, List[Dict]]]:
+        try:
+            flow = self.config.get_repository_flow(repo)
+            intermediate_commits = self.gitlab.get_intermediate_branch_commits(repo, flow, final_target_branch)
+        except Exception as e:
+            logger.error(f"Failed to find intermediate commits for {repo}: {e}")
+            return {}
         
-        return repo_intermediate_commits
+        if intermediate_commits:
+            total_commits = sum(count for count, _ in intermediate_commits.values())
+            logger.info(f"Found {total_commits} intermediate commits in {repo} across {len(intermediate_commits)} branches")
+        return intermediate_commits
     
     def create_intermediate_merge_requests(self, repo_intermediate_commits: Dict[str, Dict[str, Tuple[int, List[Dict]]]], 
                                          final_target_branch: str, sprint_name: str) -> List[MRStatus]:
         """Create MRs for intermediate branch commits."""
-        intermediate_mrs = []
-        
-        for repo, branch_commits in repo_intermediate_commits.items():
-            for intermediate_branch, (commit_count, commit_details) in branch_commits.items():
-                try:
-                    mr_status = MRStatus(
-                        repo_name=repo,
-                        source_branch=intermediate_branch,
-                        target_branch=final_target_branch,
-                        commit_count=commit_count
-                    )
-                    
-                    automation_config = self.config.get_automation_config()
-                    mr_result = self.gitlab.create_merge_request_with_commits(
-                        repo, intermediate_branch, final_target_branch, sprint_name,
-                        commit_details, auto_merge=automation_config['auto_merge']
-                    )
-                    
-                    if mr_result:
-                        mr_status.mr_id = mr_result['id']
-                        mr_status.mr_url = mr_result['web_url']
-                        mr_status.state = "created"
-                        logger.info(f"Created intermediate MR for {repo}: {intermediate_branch} → {final_target_branch}")
-                    else:
-                        mr_status.state = "failed"
-                        mr_status.error = "Failed to create intermediate MR"
-                    
-                    intermediate_mrs.append(mr_status)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to create intermediate MR for {repo}:{intermediate_branch}: {e}")
-                    mr_status = MRStatus(
-                        repo_name=repo,
-                        source_branch=intermediate_branch,
-                        target_branch=final_target_branch,
-                        state="failed",
-                        error=str(e),
-                        commit_count=commit_count
-                    )
-                    intermediate_mrs.append(mr_status)
-        
-        return intermediate_mrs
+        tasks = [(repo, intermediate_branch, commit_count, commit_details)
+                 for repo, branch_commits in repo_intermediate_commits.items()
+                 for intermediate_branch, (commit_count, commit_details) in branch_commits.items()]
+        return _run_concurrently(
+            lambda task: self._create_intermediate_mr(*task, final_target_branch, sprint_name),
+            tasks,
+            self._automation_config.get('max_workers', 8)
+        )
+    
+    def _create_intermediate_mr(self, repo: str, intermediate_branch: str, commit_count: int,
+                                commit_details: List[Dict], final_target_branch: str,
+                                sprint_name: str) -> MRStatus:
+        """Create one intermediate-branch MR; failures come back as a failed MRStatus."""
+        try:
+            mr_result = self.gitlab.create_merge_request_with_commits(
+                repo, intermediate_branch, final_target_branch, sprint_name,
+                commit_details, auto_merge=self._automation_config['auto_merge']
+            )
+            
+            if mr_result:
+                logger.info(f"Created intermediate MR for {repo}: {intermediate_branch} → {final_target_branch}")
+            
+            return _mr_status_from_result(repo, intermediate_branch, final_target_branch, commit_count,
+                                          mr_result, "Failed to create intermediate MR")
+            
+        except Exception as e:
+            logger.error(f"Failed to create intermediate MR for {repo}:{intermediate_branch}: {e}")
+            return MRStatus(
+                repo_name=repo,
+                source_branch=intermediate_branch,
+                target_branch=final_target_branch,
+                state="failed",
+                error=str(e),
+                commit_count=commit_count
+            )
     
     def process_additional_commits(self, repos: List[str], current_target_branch: str, 
                                  final_target_branch: str, sprint_name: str) -> List[MRStatus]:
         """Process additional commits from various branches."""
         logger.info(f"Processing additional commits for {len(repos)} repositories")
         
-        all_additional_mrs = []
-        
-        # Find branches with new commits
-        repo_branches = self.find_branches_with_new_commits(repos, current_target_branch, final_target_branch)
+        max_workers = self._automation_config.get('max_workers', 8)
+        found: Dict[str, dict] = {repo: {} for repo in repos}
+        repo_branches: Dict[str, List[Tuple[str, int]]] = {}
+        repo_intermediate_commits: Dict[str, Dict[str, Tuple[int, List[Dict]]]] = {}
+        additional_futures: Dict[str, list] = {}
+        intermediate_futures: Dict[str, list] = {}
+        
+        # Discovery (compare GETs) and creation (POSTs) overlap: a repository's MRs are queued as soon as
+        # both of its lookups finish, while other repositories are still being scanned. Every
+        # (repo, branch) MR is its own creation task, as in create_additional_merge_requests
+        # and create_intermediate_merge_requests. A branch found by both scans is queued once,
+        # since two concurrent POSTs for the same source -> target pair would collide
+        with ThreadPoolExecutor(max_workers=max_workers) as discovery, \
+                ThreadPoolExecutor(max_workers=max_workers) as creation:
+            lookups = {}
+            for repo in repos:
+                lookups[discovery.submit(self._find_repo_branches, repo, current_target_branch,
+                                         final_target_branch)] = (repo, "branches")
+                lookups[discovery.submit(self._find_repo_intermediate_commits, repo,
+                                         final_target_branch)] = (repo, "intermediate")
+            
+            for future in as_completed(lookups):
+                repo, kind = lookups[future]
+                found[repo][kind] = future.result()
+                if len(found[repo]) < 2:
+                    continue
+                
+                branches, intermediate_commits = found[repo]["branches"], found[repo]["intermediate"]
+                if branches:
+                    repo_branches[repo] = branches
+                    additional_futures[repo] = [
+                        creation.submit(self._create_additional_mr, repo, branch_name, commit_count,
+                                        final_target_branch, sprint_name)
+                        for branch_name, commit_count in branches
+                    ]
+                if intermediate_commits:
+                    repo_intermediate_commits[repo] = intermediate_commits
+                    queued_sources = {branch_name for branch_name, _ in branches}
+                    intermediate_futures[repo] = [
+                        creation.submit(self._create_intermediate_mr, repo, branch_name, commit_count,
+                                        commit_details, final_target_branch, sprint_name)
+                        for branch_name, (commit_count, commit_details) in intermediate_commits.items()
+                        if branch_name not in queued_sources
+                    ]
+            
+            # Keep the sequential layout: every additional MR (in repo order), then every intermediate MR
+            all_additional_mrs = [f.result() for repo in repos for f in additional_futures.get(repo, [])]
+            all_additional_mrs.extend(f.result() for repo in repos for f in intermediate_futures.get(repo, []))
         
         if repo_branches:
             total_branches = sum(len(branches) for branches in repo_branches.values())
             logger.info(f"Found {total_branches} additional branches with new commits")
-            
-            additional_mrs = self.create_additional_merge_requests(repo_branches, final_target_branch, sprint_name)
-            all_additional_mrs.extend(additional_mrs)
-        
-        # Find intermediate branch commits
-        repo_intermediate_commits = self.find_intermediate_branch_commits(repos, final_target_branch)
         
         if repo_intermediate_commits:
             total_intermediate_commits = sum(
@@ -505,9 +640,6 @@ class MRAutomation:
                 for branch_commits in repo_intermediate_commits.values()
             )
             logger.info(f"Found {total_intermediate_commits} intermediate branch commits")
-            
-            intermediate_mrs = self.create_intermediate_merge_requests(repo_intermediate_commits, final_target_branch, sprint_name)
-            all_additional_mrs.extend(intermediate_mrs)
         
         # Create progressive MRs
         progressive_mrs = self.create_progressive_merge_requests(repos, sprint_name)
@@ -524,69 +656,67 @@ class MRAutomation:
     
     def create_progressive_merge_requests(self, repos: List[str], sprint_name: str) -> List[MRStatus]:
         """Create progressive merge requests for merged branches."""
+        self._open_mr_pairs = {}
+        results = _run_concurrently(
+            lambda repo: self._create_progressive_mrs_for_repo(repo, sprint_name),
+            repos,
+            self._automation_config.get('max_workers', 8)
+        )
+        return [mr_status for repo_mrs in results for mr_status in repo_mrs]
+    
+    def _create_progressive_mrs_for_repo(self, repo: str, sprint_name: str) -> List[MRStatus]:
+        """Walk one repository's flow and create the next progressive MR."""
         progressive_mrs = []
         
-        for repo in repos:
-            try:
-                flow = self.config.get_repository_flow(repo)
+        try:
+            flow = self.config.get_repository_flow(repo)
+            
+            for i in range(len(flow) - 1):
+                source_branch = flow[i]
+                target_branch = flow[i + 1]
                 
-                for i in range(len(flow) - 1):
-                    source_branch = flow[i]
-                    target_branch = flow[i + 1]
-                    
-                    if not self._is_branch_merged_to_target(repo, source_branch, target_branch):
-                        continue
-                    
-                    if i + 1 >= len(flow) - 1:
+                if not self._is_branch_merged_to_target(repo, source_branch, target_branch):
+                    continue
+                
+                if i + 1 >= len(flow) - 1:
+                    continue
+                
+                next_branch = flow[i + 2]
+                
+                # ตรวจสอบว่า next_branch trigger environment ที่มี wait_for_deployment = true หรือไม่
+                should_stop_at_next = self._should_stop_at_deploy_branch(next_branch)
+                
+                # Same pair the next iteration checks for merged-ness, so the memo serves both
+                has_commits, commit_count = self._validate_commits(repo, target_branch, next_branch)
+                
+                if has_commits:
+                    if self._check_existing_mr(repo, target_branch, next_branch):
+                        logger.info(f"MR already exists for {repo}: {target_branch} -> {next_branch}")
+                        # ถ้าต้องหยุดที่ next_branch นี้ ให้ break
+                        if should_stop_at_next:
+                            logger.info(f"Stopping at deploy branch {next_branch} due to wait_for_deployment=true")
+                            break
                         continue
                     
-                    next_branch = flow[i + 2]
+                    mr_result = self.gitlab.create_merge_request(
+                        repo, target_branch, next_branch, sprint_name,
+                        auto_merge=self._automation_config['auto_merge']
+                    )
                     
-                    # ตรวจสอบว่า next_branch trigger environment ที่มี wait_for_deployment = true หรือไม่
-                    should_stop_at_next = self._should_stop_at_deploy_branch(next_branch)
+                    progressive_mrs.append(_mr_status_from_result(
+                        repo, target_branch, next_branch, commit_count,
+                        mr_result, "Failed to create progressive MR"
+                    ))
+                    if mr_result and repo in self._open_mr_pairs:
+                        self._open_mr_pairs[repo].add((target_branch, next_branch))
                     
-                    has_commits, commit_count = self.gitlab.validate_commits(repo, target_branch, next_branch)
+                    # ถ้าต้องหยุดที่ next_branch นี้ ให้ break
+                    if should_stop_at_next:
+                        logger.info(f"Stopping at deploy branch {next_branch} due to wait_for_deployment=true")
+                    break
                     
-                    if has_commits:
-                        if self._check_existing_mr(repo, target_branch, next_branch):
-                            logger.info(f"MR already exists for {repo}: {target_branch} -> {next_branch}")
-                            # ถ้าต้องหยุดที่ next_branch นี้ ให้ break
-                            if should_stop_at_next:
-                                logger.info(f"Stopping at deploy branch {next_branch} due to wait_for_deployment=true")
-                                break
-                            continue
-                        
-                        automation_config = self.config.get_automation_config()
-                        mr_result = self.gitlab.create_merge_request(
-                            repo, target_branch, next_branch, sprint_name,
-                            auto_merge=automation_config['auto_merge']
-                        )
-                        
-                        mr_status = MRStatus(
-                            repo_name=repo,
-                            source_branch=target_branch,
-                            target_branch=next_branch,
-                            commit_count=commit_count
-                        )
-                        
-                        if mr_result:
-                            mr_status.mr_id = mr_result['id']
-                            mr_status.mr_url = mr_result['web_url']
-                            mr_status.state = "created"
-                        else:
-                            mr_status.state = "failed"
-                            mr_status.error = "Failed to create progressive MR"
-                        
-                        progressive_mrs.append(mr_status)
-                        
-                        # ถ้าต้องหยุดที่ next_branch นี้ ให้ break
-                        if should_stop_at_next:
-                            logger.info(f"Stopping at deploy branch {next_branch} due to wait_for_deployment=true")
-                        break
-                        
-            except Exception as e:
-                logger.error(f"Error creating progressive MR for {repo}: {e}")
-                continue
+        except Exception as e:
+            logger.error(f"Error creating progressive MR for {repo}: {e}")
         
         return progressive_mrs
     
@@ -600,32 +730,31 @@ class MRAutomation:
         Returns:
             True ถ้าต้องหยุดที่ branch นี้เนื่องจาก wait_for_deployment = true
         """
-        try:
-            config_dict = self.config.load_config()
-            for env_name, env_config in config_dict.get('environments', {}).items():
-                triggered_by = env_config.get('triggered_by', [])
-                wait_for_deployment = env_config.get('wait_for_deployment', False)
-                
-                if target_branch in triggered_by and wait_for_deployment:
-                    logger.debug(f"Target branch {target_branch} triggers {env_name} with wait_for_deployment=true")
-                    return True
-            
-            return False
-        except Exception as e:
-            logger.debug(f"Error checking deploy branch stop condition for {target_branch}: {e}")
-            return False
+        if self.config.is_wait_for_deployment_branch(target_branch):
+            logger.debug(f"Target branch {target_branch} triggers an environment with wait_for_deployment=true")
+            return True
+        return False
     
     def _is_branch_merged_to_target(self, repo_name: str, source_branch: str, target_branch: str) -> bool:
         """Check if source branch is merged to target branch."""
+        key = (repo_name, source_branch, target_branch)
+        if key in self._merged_pairs:
+            return True
+        # (False, 0) may also mean a missing branch or a failed compare, so only trust "has commits"
+        cached = self._commits_cache.get(key)
+        if cached is not None and cached[0]:
+            return False
+        
         try:
-            if not self.gitlab.branch_exists(repo_name, source_branch):
-                return False
-            
-            if not self.gitlab.branch_exists(repo_name, target_branch):
+            # One compare answers both questions: it 404s when either branch is missing
+            commit_count = self.gitlab.count_new_commits(repo_name, source_branch, target_branch)
+            if commit_count is None:
                 return False
             
-            has_commits, commit_count = self.gitlab.validate_commits(repo_name, source_branch, target_branch)
-            return not has_commits
+            self._commits_cache[key] = (commit_count > 0, commit_count)
+            if commit_count == 0:
+                self._merged_pairs.add(key)
+            return commit_count == 0
                 
         except Exception as e:
             logger.debug(f"Error checking merge status for {repo_name} {source_branch} -> {target_branch}: {e}")
@@ -633,6 +762,12 @@ class MRAutomation:
     
     def _check_existing_mr(self, repo_name: str, source_branch: str, target_branch: str) -> bool:
         """Check if MR already exists for branch pair."""
-        # This is a simplified implementation - would need actual GitLab API call
-        # in real implementation
-        return False
\ No newline at end of file
+        open_pairs = self._open_mr_pairs.get(repo_name)
+        if open_pairs is None:
+            try:
+                open_pairs = self._open_mr_pairs[repo_name] = self.gitlab.get_open_mr_pairs(repo_name)
+            except Exception as e:
+                # create_merge_request still detects an existing MR on its own
+                logger.debug(f"Error listing open MRs for {repo_name}: {e}")
+                return False
+        return (source_branch, target_branch) in open_pairs
\ No newline at end of file
@@ -3,45 +3,47 @@
 Test script to validate the pipeline success notification functionality
 """
 
-import yaml
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from discord_notifier import DiscordNotifier
 
 def test_pipeline_notification():
     """Test the pipeline success notification"""
     
-    # Load config
+    # Only the webhook URL is needed here, so skip loading config.yaml.
+    # On CI the payloads are built and encoded but not posted to Discord
     try:
-        with open('config.yaml', 'r') as f:
-            config = yaml.safe_load(f)
-    except FileNotFoundError:
-        print("❌ config.yaml not found. Please ensure it exists.")
+        notifier = DiscordNotifier.from_env(dry_run=os.getenv('CI', '').lower() in ('1', 'true', 'yes'))
+    except ValueError as e:
+        print(f"❌ {e}. Please set it to a Discord webhook URL.")
         return False
     
     try:
-        # Initialize Discord notifier
-        discord_webhook = config['discord']['webhook_url']
-        notifier = DiscordNotifier(discord_webhook, config)
         
-        # Test the pipeline success notification
+        # The two notifications are independent, so send them at the same time
         print("🧪 Testing pipeline success notification...")
-        success1 = notifier.send_pipeline_success_notification(
-            repo_name="ms-self-serve",
-            mr_id=535,
-            mr_url="https://gitlab.example.com/group/ms-self-serve/-/merge_requests/535"
-        )
+        print("🧪 Testing auto-merge waiting notification...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pipeline_future = executor.submit(
+                notifier.send_pipeline_success_notification,
+                repo_name="ms-self-serve",
+                mr_id=535,
+                mr_url="https://gitlab.example.com/group/ms-self-serve/-/merge_requests/535"
+            )
+            auto_merge_future = executor.submit(
+                notifier.send_auto_merge_waiting_notification,
+                repo_name="explore-go",
+                mr_id=1665,
+                mr_url="https://gitlab.example.com/group/explore-go/-/merge_requests/1665"
+            )
+            success1 = pipeline_future.result()
+            success2 = auto_merge_future.result()
         
         if success1:
             print("✅ Pipeline success notification sent successfully!")
         else:
             print("❌ Failed to send pipeline success notification")
-            
-        # Test the auto-merge waiting notification  
-        print("🧪 Testing auto-merge waiting notification...")
-        success2 = notifier.send_auto_merge_waiting_notification(
-            repo_name="explore-go",
-            mr_id=1665,
-            mr_url="https://gitlab.example.com/group/explore-go/-/merge_requests/1665"
-        )
         
         if success2:
             print("✅ Auto-merge waiting notification sent successfully!")
@@ -56,4 +58,4 @@ def test_pipeline_notification():
 
 if __name__ == "__main__":
     print("🧪 Testing MR monitoring Discord notifications...")
-    test_pipeline_notification()
\ No newline at end of file
+    test_pipeline_notification()